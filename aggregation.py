@@ -0,0 +1,337 @@
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from ingest import BUFFER_SIZE, add_rejected, get_invalid_reason, get_salary, get_validators, open_csv, parse_salary, \
+    read_rows
+
+
+class Profession:
+    __slots__ = ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at')
+
+    def __init__(self, name, salary_from, salary_to, salary_currency, area_name, published_at):
+        self.name = name
+        self.salary_from = parse_salary(salary_from)
+        self.salary_to = parse_salary(salary_to)
+        self.salary_currency = salary_currency
+        self.area_name = area_name
+        self.published_at = published_at
+
+    def get_year(self):
+        return int(self.published_at[:4])
+
+
+class SalaryAccumulator:
+    def __init__(self):
+        self.count = 0
+        self.sums = dict()
+
+    def add(self, salary, rate):
+        self.count += 1
+        self.sums[rate] = self.sums.get(rate, 0) + salary
+
+    def merge(self, other):
+        self.count += other.count
+        for rate, value in other.sums.items():
+            self.sums[rate] = self.sums.get(rate, 0) + value
+
+    def to_list(self):
+        return [self.count, [[rate, value] for rate, value in self.sums.items()]]
+
+    @staticmethod
+    def from_list(data):
+        accumulator = SalaryAccumulator()
+        accumulator.count = data[0]
+        accumulator.sums = {rate: value for rate, value in data[1]}
+        return accumulator
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return int(sum(rate * value for rate, value in sorted(self.sums.items())) // self.count)
+
+
+class Statistics:
+    def __init__(self, profession_name, currency_rates):
+        self.profession_name = profession_name
+        self.currency_rates = currency_rates
+        self.years = dict()
+        self.profession_years = dict()
+        self.cities = dict()
+        self.count_vacancy = 0
+        self.rejected = dict()
+
+    def add(self, profession):
+        year = profession.get_year()
+        salary = get_salary(profession.salary_from, profession.salary_to)
+        rate = self.currency_rates.get_rate(profession.salary_currency, profession.published_at)
+        if year not in self.years:
+            self.years[year] = SalaryAccumulator()
+            self.profession_years[year] = SalaryAccumulator()
+        self.years[year].add(salary, rate)
+        if self.profession_name in profession.name:
+            self.profession_years[year].add(salary, rate)
+        if profession.area_name not in self.cities:
+            self.cities[profession.area_name] = SalaryAccumulator()
+        self.cities[profession.area_name].add(salary, rate)
+        self.count_vacancy += 1
+
+    def merge(self, other):
+        for collection, other_collection in [[self.years, other.years],
+                                             [self.profession_years, other.profession_years],
+                                             [self.cities, other.cities]]:
+            merge_collection(collection, other_collection)
+        self.count_vacancy += other.count_vacancy
+        merge_counts(self.rejected, other.rejected)
+        return self
+
+    def to_dict(self):
+        data = {'profession_name': self.profession_name, 'count_vacancy': self.count_vacancy,
+                'rejected': self.rejected}
+        for name in ['years', 'profession_years', 'cities']:
+            data[name] = [[key, accumulator.to_list()] for key, accumulator in getattr(self, name).items()]
+        return data
+
+    @staticmethod
+    def from_dict(data, currency_rates):
+        statistics = Statistics(data['profession_name'], currency_rates)
+        statistics.count_vacancy = data['count_vacancy']
+        statistics.rejected = data.get('rejected', dict())
+        for name in ['years', 'profession_years', 'cities']:
+            setattr(statistics, name, {key: SalaryAccumulator.from_list(value) for key, value in data[name]})
+        return statistics
+
+    def get_year_info(self, years):
+        salary_dict = {key: accumulator.mean() for key, accumulator in years.items()}
+        count_dict = {key: accumulator.count for key, accumulator in years.items()}
+        return salary_dict, count_dict
+
+    def get_city_info(self):
+        ans_dict = dict()
+        percent_dict = dict()
+        for key, accumulator in self.cities.items():
+            if accumulator.count >= self.count_vacancy // 100:
+                ans_dict[key] = accumulator.mean()
+                percent_dict[key] = round(accumulator.count / self.count_vacancy, 4)
+        ans_dict = dict(sorted(ans_dict.items(), key=lambda item: item[1], reverse=True)[:10])
+        percent_dict = dict(sorted(percent_dict.items(), key=lambda item: item[1], reverse=True)[:10])
+        return ans_dict, percent_dict
+
+
+class ProfessionMatcher:
+    def __init__(self, patterns):
+        self.goto = [dict()]
+        self.fail = [0]
+        self.output = [[]]
+        self.always = [index for index, pattern in enumerate(patterns) if pattern == '']
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto[node][char] = len(self.goto)
+                    self.goto.append(dict())
+                    self.fail.append(0)
+                    self.output.append([])
+                node = self.goto[node][char]
+            if pattern != '':
+                self.output[node].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        found = set(self.always)
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            found.update(self.output[node])
+        return sorted(found)
+
+
+class BatchStatistics(Statistics):
+    def __init__(self, profession_names, currency_rates):
+        super().__init__('', currency_rates)
+        self.profession_names = list(profession_names)
+        self.professions_years = [dict() for _ in self.profession_names]
+        self.matcher = ProfessionMatcher(self.profession_names)
+        self.matches = dict()
+
+    def add(self, profession):
+        year = profession.get_year()
+        salary = get_salary(profession.salary_from, profession.salary_to)
+        rate = self.currency_rates.get_rate(profession.salary_currency, profession.published_at)
+        if year not in self.years:
+            self.years[year] = SalaryAccumulator()
+        self.years[year].add(salary, rate)
+        indexes = self.matches.get(profession.name)
+        if indexes is None:
+            indexes = self.matches[profession.name] = self.matcher.find(profession.name)
+        for index in indexes:
+            years = self.professions_years[index]
+            if year not in years:
+                years[year] = SalaryAccumulator()
+            years[year].add(salary, rate)
+        if profession.area_name not in self.cities:
+            self.cities[profession.area_name] = SalaryAccumulator()
+        self.cities[profession.area_name].add(salary, rate)
+        self.count_vacancy += 1
+
+    def merge(self, other):
+        super().merge(other)
+        for years, other_years in zip(self.professions_years, other.professions_years):
+            merge_collection(years, other_years)
+        return self
+
+    def get_profession_years(self, index):
+        years = self.professions_years[index]
+        return {year: years.get(year, SalaryAccumulator()) for year in self.years}
+
+
+class NameStatistics(Statistics):
+    def __init__(self, currency_rates):
+        super().__init__('', currency_rates)
+        self.names = dict()
+
+    def add(self, profession):
+        year = profession.get_year()
+        salary = get_salary(profession.salary_from, profession.salary_to)
+        rate = self.currency_rates.get_rate(profession.salary_currency, profession.published_at)
+        if year not in self.years:
+            self.years[year] = SalaryAccumulator()
+        self.years[year].add(salary, rate)
+        years = self.names.get(profession.name)
+        if years is None:
+            years = self.names[profession.name] = dict()
+        if year not in years:
+            years[year] = SalaryAccumulator()
+        years[year].add(salary, rate)
+        if profession.area_name not in self.cities:
+            self.cities[profession.area_name] = SalaryAccumulator()
+        self.cities[profession.area_name].add(salary, rate)
+        self.count_vacancy += 1
+
+    def merge(self, other):
+        super().merge(other)
+        for name, years in other.names.items():
+            if name not in self.names:
+                self.names[name] = dict()
+            merge_collection(self.names[name], years)
+        return self
+
+    def select(self, profession_name):
+        statistics = create_statistics(profession_name, self.currency_rates)
+        merge_collection(statistics.years, self.years)
+        merge_collection(statistics.cities, self.cities)
+        statistics.count_vacancy = self.count_vacancy
+        merge_counts(statistics.rejected, self.rejected)
+        is_batch = isinstance(profession_name, list)
+        matcher = statistics.matcher if is_batch else ProfessionMatcher([profession_name])
+        professions_years = statistics.professions_years if is_batch else [statistics.profession_years]
+        for name, years in self.names.items():
+            for index in matcher.find(name):
+                merge_collection(professions_years[index], years)
+        if not is_batch:
+            statistics.profession_years = {year: statistics.profession_years.get(year, SalaryAccumulator())
+                                           for year in statistics.years}
+        return statistics
+
+
+def create_statistics(profession_name, currency_rates):
+    if profession_name is None:
+        return NameStatistics(currency_rates)
+    if isinstance(profession_name, list):
+        return BatchStatistics(profession_name, currency_rates)
+    return Statistics(profession_name, currency_rates)
+
+
+def merge_counts(counts, other_counts):
+    for key, count in other_counts.items():
+        counts[key] = counts.get(key, 0) + count
+
+
+def merge_collection(collection, other_collection):
+    for key, accumulator in other_collection.items():
+        if key not in collection:
+            collection[key] = SalaryAccumulator()
+        collection[key].merge(accumulator)
+
+
+def find_chunks(file_name, count):
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8-sig')]))
+        position = file.tell()
+        boundaries = [position]
+        quotes = 0
+        for index in range(1, count):
+            target = boundaries[0] + (size - boundaries[0]) * index // count
+            if target <= position:
+                continue
+            quotes += file.read(target - position).count(b'"')
+            position = target
+            for line in iter(file.readline, b''):
+                quotes += line.count(b'"')
+                position += len(line)
+                if quotes % 2 == 0:
+                    break
+            if position >= size:
+                break
+            boundaries.append(position)
+    return header, list(zip(boundaries, boundaries[1:] + [size]))
+
+
+def read_lines(file_name, start, end):
+    with open(file_name, 'rb', buffering=BUFFER_SIZE) as file:
+        file.seek(start)
+        while start < end:
+            line = file.readline()
+            if not line:
+                break
+            start += len(line)
+            yield line.decode('utf-8')
+
+
+def aggregate_rows(rows, header, profession_keys, statistics):
+    for values in read_rows(rows, header, profession_keys, statistics.rejected):
+        try:
+            statistics.add(Profession(*values))
+        except (ValueError, KeyError):
+            add_rejected(statistics.rejected, get_invalid_reason(
+                values, profession_keys, get_validators(statistics.currency_rates.currencies)))
+    return statistics
+
+
+def aggregate_table_rows(table, profession_keys, statistics):
+    valid = table.get_valid(profession_keys, statistics.rejected, get_validators(statistics.currency_rates.currencies))
+    return aggregate_rows(table.get_rows(valid, profession_keys), profession_keys, profession_keys, statistics)
+
+
+def aggregate_chunk(file_name, header, start, end, profession_keys, profession_name, currency_rates):
+    return aggregate_rows(csv.reader(read_lines(file_name, start, end)), header, profession_keys,
+                          create_statistics(profession_name, currency_rates))
+
+
+def aggregate_file(file_name, profession_keys, profession_name, currency_rates, workers=1):
+    statistics = create_statistics(profession_name, currency_rates)
+    if workers <= 1:
+        with open_csv(file_name) as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            return aggregate_rows(reader, header, profession_keys, statistics)
+    header, chunks = find_chunks(file_name, workers * 4)
+    with ProcessPoolExecutor(workers) as pool:
+        partials = [pool.submit(aggregate_chunk, file_name, header, start, end, profession_keys, profession_name,
+                                currency_rates) for start, end in chunks]
+        for partial in partials:
+            statistics.merge(partial.result())
+    return statistics
@@ -0,0 +1,90 @@
+import os
+import time
+from collections import OrderedDict
+import approximate
+import diagrams
+import statistic
+from currency import get_currency_rates
+from instrumentation import tracer
+from query import VacancyQuery
+
+
+class LoadedDataset:
+    def __init__(self, file_name, use_cache=True, workers=1, backend='auto', rates_name=None, statistics_size=32):
+        self.file_name = file_name
+        self.use_cache = use_cache
+        self.workers = workers
+        self.backend = backend
+        self.rates_name = rates_name
+        self.vacancy_query = None
+        self.statistics_size = statistics_size
+        self.statistics = OrderedDict()
+        self.name_statistics = None
+
+    def get_query(self):
+        if self.vacancy_query is None:
+            with tracer.stage('load'):
+                vacancies = statistic.DataSet(self.file_name, self.use_cache).csv_filer() or []
+            with tracer.stage('index'):
+                self.vacancy_query = VacancyQuery(vacancies, get_currency_rates(self.rates_name))
+        return self.vacancy_query
+
+    def query(self, filter_string='', sort_string='', reverse=False, start=0, end=None):
+        return self.get_query().execute(filter_string, sort_string, reverse, start, end)
+
+    def get_table(self, filter_string='', sort_string='', reverse_sort='', numbers='', skills=''):
+        if os.stat(self.file_name).st_size == 0:
+            return "Пустой файл"
+        message = statistic.check_parameters(filter_string, sort_string, reverse_sort) or \
+            statistic.check_numbers(numbers)
+        if message is not None:
+            return message
+        vacancy_query = self.get_query()
+        return statistic.get_vacancy_table(vacancy_query if vacancy_query.vacancies else None, filter_string,
+                                           sort_string, reverse_sort, numbers, skills)
+
+    def table(self, filter_string='', sort_string='', reverse_sort='', numbers='', skills=''):
+        vacancy_table = self.get_table(filter_string, sort_string, reverse_sort, numbers, skills)
+        with tracer.stage('render'):
+            return str(vacancy_table)
+
+    def get_name_statistics(self):
+        if self.name_statistics is None:
+            self.name_statistics = diagrams.aggregate_data(self.file_name, diagrams.PROFESSION_KEYS, None,
+                                                           get_currency_rates(self.rates_name), self.use_cache,
+                                                           self.workers, self.backend)
+        return self.name_statistics
+
+    def get_statistics(self, profession_name):
+        key = tuple(profession_name) if isinstance(profession_name, list) else profession_name
+        if key not in self.statistics:
+            self.statistics[key] = self.get_name_statistics().select(profession_name)
+            if len(self.statistics) > self.statistics_size:
+                self.statistics.popitem(last=False)
+        else:
+            self.statistics.move_to_end(key)
+        return self.statistics[key]
+
+    def get_approximate_statistics(self, profession_name, fraction=0.05, sample_name=None, seed=0, confidence=0.95):
+        currency_rates = get_currency_rates(self.rates_name)
+        if sample_name is not None:
+            return approximate.read_sample(sample_name, profession_name, currency_rates, confidence)
+        return approximate.sample_file(self.file_name, profession_name, currency_rates, fraction, seed, confidence)
+
+    def report(self, profession_name, output_dir='.', artifacts=tuple(diagrams.ARTIFACTS), combined=False,
+               pdf_backend='wkhtmltopdf'):
+        if isinstance(profession_name, list):
+            profession_name = list(dict.fromkeys(profession_name))
+        statistics = self.get_statistics(profession_name)
+        if isinstance(profession_name, list):
+            start = time.perf_counter()
+            diagrams.write_batch_reports(diagrams.ReportModel.from_batch(statistics), output_dir, combined,
+                                         artifacts, self.workers, pdf_backend)
+            return {'reports': time.perf_counter() - start}
+        os.makedirs(output_dir, exist_ok=True)
+        return diagrams.Report(diagrams.ReportModel.from_statistics(statistics), output_dir,
+                               pdf_backend).generate(artifacts)
+
+
+def load_dataset(file_name, use_cache=True, workers=1, backend='auto', rates_name=None, statistics_size=32):
+    return LoadedDataset(file_name, use_cache, workers, backend, rates_name, statistics_size)
@@ -0,0 +1,266 @@
+import csv
+import json
+import math
+import os
+import random
+from statistics import NormalDist
+from aggregation import Profession, Statistics, find_chunks, merge_counts, read_lines
+from currency import CURRENCIES
+from ingest import add_rejected, get_invalid_reason, get_salary, get_validators, open_csv, read_full_rows
+from sketches import HyperLogLog, TDigest
+
+PROFESSION_KEYS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+PERCENTILES = [10, 25, 50, 75, 90]
+BLOCK_SIZE = 1 << 16
+MIN_CHUNKS = 32
+
+
+class SampleAccumulator:
+    def __init__(self):
+        self.weight = 0
+        self.total = 0
+        self.spread = [0, 0, 0]
+
+    @property
+    def count(self):
+        return round(self.weight)
+
+    def add(self, salary, weight):
+        self.weight += weight
+        self.total += salary * weight
+        factor = weight * (weight - 1)
+        self.spread[0] += factor
+        self.spread[1] += factor * salary
+        self.spread[2] += factor * salary * salary
+
+    def add_spread(self, count, total, scale):
+        self.spread[0] += scale * count * count
+        self.spread[1] += scale * count * total
+        self.spread[2] += scale * total * total
+
+    def merge(self, other):
+        self.weight += other.weight
+        self.total += other.total
+        self.spread = [value + other_value for value, other_value in zip(self.spread, other.spread)]
+
+    def mean(self):
+        return int(self.total / self.weight) if self.weight else 0
+
+    def get_intervals(self, z):
+        mean = self.total / self.weight if self.weight else 0
+        count_error = z * math.sqrt(self.spread[0])
+        variance = self.spread[2] - 2 * mean * self.spread[1] + mean * mean * self.spread[0]
+        mean_error = z * math.sqrt(max(variance, 0)) / self.weight if self.weight else 0
+        return {'salary': [max(int(mean - mean_error), 0), int(mean + mean_error)],
+                'count': [max(round(self.weight - count_error), 0), round(self.weight + count_error)]}
+
+
+class ApproximateStatistics(Statistics):
+    def __init__(self, profession_name, currency_rates, confidence=0.95, employers=None):
+        super().__init__(profession_name, currency_rates)
+        self.confidence = confidence
+        self.total_weight = 0
+        self.sampled = 0
+        self.digests = {'all': TDigest(), 'profession': TDigest()}
+        self.year_digests = dict()
+        self.employers = employers if employers is not None else dict()
+        self.exact_years = False
+
+    def add(self, profession, weight=1):
+        year = profession.get_year()
+        salary = get_salary(profession.salary_from, profession.salary_to) * \
+            self.currency_rates.get_rate(profession.salary_currency, profession.published_at)
+        if year not in self.years:
+            self.years[year] = SampleAccumulator()
+            self.profession_years[year] = SampleAccumulator()
+            self.year_digests[year] = TDigest()
+        self.years[year].add(salary, weight)
+        self.year_digests[year].add(salary, weight)
+        self.digests['all'].add(salary, weight)
+        if self.profession_name in profession.name:
+            self.profession_years[year].add(salary, weight)
+            self.digests['profession'].add(salary, weight)
+        if profession.area_name not in self.cities:
+            self.cities[profession.area_name] = SampleAccumulator()
+        self.cities[profession.area_name].add(salary, weight)
+        self.total_weight += weight
+        self.sampled += 1
+
+    def merge(self, other):
+        for collection, other_collection in [[self.years, other.years],
+                                             [self.profession_years, other.profession_years],
+                                             [self.cities, other.cities]]:
+            for key, accumulator in other_collection.items():
+                collection.setdefault(key, SampleAccumulator()).merge(accumulator)
+        for collection, other_collection in [[self.digests, other.digests], [self.year_digests, other.year_digests]]:
+            for key, digest in other_collection.items():
+                collection.setdefault(key, TDigest()).merge(digest)
+        for key, sketch in other.employers.items():
+            self.employers.setdefault(key, HyperLogLog(sketch.precision)).merge(sketch)
+        merge_counts(self.rejected, other.rejected)
+        self.total_weight += other.total_weight
+        self.sampled += other.sampled
+        return self
+
+    def merge_clusters(self, first, second, scale):
+        self.merge(first)
+        self.merge(second)
+        empty = SampleAccumulator()
+        for collection, first_collection, second_collection in [
+                [self.years, first.years, second.years],
+                [self.profession_years, first.profession_years, second.profession_years],
+                [self.cities, first.cities, second.cities]]:
+            for key in {**first_collection, **second_collection}:
+                first_accumulator = first_collection.get(key, empty)
+                second_accumulator = second_collection.get(key, empty)
+                collection[key].add_spread(first_accumulator.weight - second_accumulator.weight,
+                                           first_accumulator.total - second_accumulator.total, scale)
+        return self
+
+    def get_city_info(self):
+        self.count_vacancy = round(self.total_weight)
+        return super().get_city_info()
+
+    def get_intervals(self):
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        cities = self.get_city_info()
+        years = {key: accumulator.get_intervals(z) for key, accumulator in self.years.items()}
+        if self.exact_years:
+            for key, intervals in years.items():
+                intervals['count'] = [self.years[key].count] * 2
+        return {'years': years,
+                'profession_years': {key: accumulator.get_intervals(z)
+                                     for key, accumulator in self.profession_years.items()},
+                'cities': {key: self.cities[key].get_intervals(z) for key in {**cities[0], **cities[1]}}}
+
+    def get_percentiles(self, percentiles=PERCENTILES):
+        return {name: {percentile: round(digest.quantile(percentile / 100)) for percentile in percentiles}
+                for name, digest in self.digests.items() if digest.centroids or digest.buffer}
+
+    def get_year_medians(self):
+        return {key: round(digest.quantile(0.5)) for key, digest in self.year_digests.items()}
+
+    def get_distinct_employers(self):
+        return dict(sorted(((key, sketch.count()) for key, sketch in self.employers.items()),
+                           key=lambda item: item[1], reverse=True)[:10])
+
+
+def add_row(statistics, row, indexes, weight):
+    values = [row[index] for index in indexes]
+    try:
+        statistics.add(Profession(*values), weight)
+    except (ValueError, KeyError):
+        add_rejected(statistics.rejected, get_invalid_reason(values, PROFESSION_KEYS,
+                                                             get_validators(statistics.currency_rates.currencies)))
+
+
+def get_weight(strata, year):
+    seen, sampled = strata[year]
+    return seen / sampled
+
+
+def write_sample(file_name, sample_name, size=1000, seed=0, precision=12):
+    generator = random.Random(seed)
+    strata = dict()
+    employers = dict()
+    rejected = dict()
+    with open_csv(file_name) as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        year_index, area_index = header.index('published_at'), header.index('area_name')
+        employer_index = header.index('employer_name') if 'employer_name' in header else None
+        for position, row in enumerate(read_full_rows(reader, header, PROFESSION_KEYS, rejected,
+                                                      get_validators(CURRENCIES))):
+            stratum = strata.setdefault(row[year_index][:4], [0, []])
+            stratum[0] += 1
+            if len(stratum[1]) < size:
+                stratum[1].append((position, row))
+            else:
+                index = generator.randrange(stratum[0])
+                if index < size:
+                    stratum[1][index] = (position, row)
+            if employer_index is not None and row[employer_index]:
+                if row[area_index] not in employers:
+                    employers[row[area_index]] = HyperLogLog(precision)
+                employers[row[area_index]].add(row[employer_index])
+
+    with open(sample_name, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(row for _, row in sorted((sample for _, samples in strata.values() for sample in samples),
+                                                  key=lambda sample: sample[0]))
+    with open(sample_name + '.json', 'w', encoding='utf-8') as file:
+        json.dump({'source': os.path.abspath(file_name), 'size': size, 'seed': seed,
+                   'strata': {year: [seen, len(samples)] for year, (seen, samples) in strata.items()},
+                   'rejected': rejected, 'employers': {key: sketch.to_string() for key, sketch in employers.items()}},
+                  file, ensure_ascii=False)
+
+
+def read_sample(sample_name, profession_name, currency_rates, confidence=0.95):
+    with open(sample_name + '.json', encoding='utf-8') as file:
+        metadata = json.load(file)
+    statistics = ApproximateStatistics(profession_name, currency_rates, confidence,
+                                       {key: HyperLogLog.from_string(value)
+                                        for key, value in metadata['employers'].items()})
+    statistics.rejected = metadata['rejected']
+    statistics.exact_years = True
+    weights = {int(year): get_weight(metadata['strata'], year) for year in metadata['strata']}
+    with open_csv(sample_name) as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        indexes = [header.index(key) for key in PROFESSION_KEYS]
+        for row in read_full_rows(reader, header, PROFESSION_KEYS, dict()):
+            add_row(statistics, row, indexes, weights[int(row[indexes[-1]][:4])])
+    return statistics
+
+
+def select_chunks(chunks, fraction, seed):
+    generator = random.Random(seed)
+    count = max(1, min(max(MIN_CHUNKS, round(len(chunks) * fraction)), len(chunks)) // 2)
+    bounds = [len(chunks) * index // count for index in range(count + 1)]
+    for start, end in zip(bounds, bounds[1:]):
+        stratum = chunks[start:end]
+        yield stratum, sorted(generator.sample(stratum, min(2, len(stratum))))
+
+
+def read_chunk(file_name, header, chunk, statistics, weight):
+    indexes = [header.index(key) for key in PROFESSION_KEYS]
+    for row in read_full_rows(csv.reader(read_lines(file_name, *chunk)), header, PROFESSION_KEYS,
+                              statistics.rejected):
+        add_row(statistics, row, indexes, weight)
+    return statistics
+
+
+def sample_file(file_name, profession_name, currency_rates, fraction=0.05, seed=0, confidence=0.95):
+    header, chunks = find_chunks(file_name, max(1, os.path.getsize(file_name) // BLOCK_SIZE))
+    statistics = ApproximateStatistics(profession_name, currency_rates, confidence)
+    for stratum, selected in select_chunks(chunks, fraction, seed):
+        if len(selected) == len(stratum):
+            for chunk in selected:
+                read_chunk(file_name, header, chunk, statistics, 1)
+            continue
+        size = sum(end - start for start, end in stratum)
+        clusters = []
+        for start, end in selected:
+            cluster = ApproximateStatistics(profession_name, currency_rates, confidence)
+            clusters.append(read_chunk(file_name, header, (start, end), cluster, size / (2 * (end - start))))
+        statistics.merge_clusters(*clusters, 1 - len(selected) / len(stratum))
+    return statistics
+
+
+def print_statistics(statistics):
+    salary_dict, count_dict = statistics.get_year_info(statistics.years)
+    print("Динамика уровня зарплат по годам (оценка):", salary_dict)
+    print('Динамика количества вакансий по годам (оценка):', count_dict)
+    salary_dict, count_dict = statistics.get_year_info(statistics.profession_years)
+    print("Динамика уровня зарплат по годам для выбранной профессии (оценка):", salary_dict)
+    print('Динамика количества вакансий по годам для выбранной профессии (оценка):', count_dict)
+    ans_dict, percent_dict = statistics.get_city_info()
+    print('Уровень зарплат по городам (в порядке убывания, оценка):', ans_dict)
+    print('Доля вакансий по городам (в порядке убывания, оценка):', percent_dict)
+    print(f'Доверительные интервалы ({statistics.confidence:.0%}):', statistics.get_intervals())
+    print('Процентили зарплат:', statistics.get_percentiles())
+    print('Медиана зарплат по годам:', statistics.get_year_medians())
+    if statistics.employers:
+        print('Число работодателей по городам:', statistics.get_distinct_employers())
+    print(f'Строк в выборке: {statistics.sampled}')
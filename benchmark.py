@@ -0,0 +1,276 @@
+import csv
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import time
+import tracemalloc
+import numpy as np
+from aggregation import Statistics, aggregate_table_rows
+from cache import get_cache_dir, load_table
+from currency import CURRENCIES, get_currency_rates
+from diagrams import Report, ReportModel
+from formatting import FIELD_FORMATTERS, fix_field, format_all
+from incremental import read_header
+from ingest import open_csv, read_rows
+from query import VacancyQuery
+from statistic import DataSet
+from vectorized import aggregate_table
+
+PROFESSION_KEYS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+EXPERIENCE_IDS = ["noExperience", "between1And3", "between3And6", "moreThan6"]
+VACANCY_HEADER = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from',
+                  'salary_to', 'salary_gross', 'salary_currency', 'area_name', 'published_at']
+PROFESSIONS = ['Программист Python', 'Python-разработчик', 'Аналитик данных', 'Бизнес-аналитик', 'Java-разработчик',
+               'Frontend-разработчик', 'Тестировщик', 'Системный администратор', 'DevOps-инженер', 'Data Scientist',
+               'Менеджер по продажам', 'Бухгалтер', 'Программист 1С', 'Инженер-программист', 'Специалист поддержки']
+CITIES = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород', 'Самара', 'Омск',
+          'Ростов-на-Дону', 'Уфа', 'Краснодар', 'Воронеж', 'Пермь', 'Волгоград', 'Тверь', 'Сочи', 'Тюмень', 'Томск',
+          'Ижевск', 'Барнаул', 'Ярославль', 'Минск', 'Алматы', 'Ташкент', 'Баку', 'Тбилиси', 'Бишкек', 'Киев']
+CITY_WEIGHTS = [30, 12] + [3] * 14 + [1] * 12
+CURRENCY_WEIGHTS = [1, 1, 2, 1, 1, 2, 80, 1, 8, 1]
+SKILLS = ['Python', 'SQL', 'Git', 'Linux', 'Docker', 'Java', 'MS Excel', 'Английский язык', '1С: Предприятие 8',
+          'Kotlin', 'PostgreSQL', 'Django', 'JavaScript', 'React', 'Деловая переписка', 'Работа в команде']
+DUTIES = ['разработка и поддержка сервисов', 'участие в code review', 'анализ требований заказчика',
+          'написание автотестов', 'оптимизация запросов к базе данных', 'подготовка отчётности']
+BENCHMARK_STAGES = ['parse', 'validate', 'index', 'filter', 'sort', 'format', 'aggregate_python', 'aggregate_numpy',
+                    'excel', 'chart', 'pdf']
+
+
+class LegacyVacancy:
+    def __init__(self, name, description, key_skills, experience_id, premium,
+                 employer_name, salary, area_name, published_at):
+        self.name = name
+        self.description = description
+        self.key_skills = key_skills.split('\n')
+        self.experience_id = experience_id
+        self.premium = premium
+        self.employer_name = employer_name
+        self.salary = salary
+        self.area_name = area_name
+        self.published_at = published_at
+
+
+class LegacySalary:
+    def __init__(self, salary_from, salary_to, salary_gross, salary_currency):
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.salary_gross = salary_gross
+        self.salary_currency = salary_currency
+
+
+def get_description(generator, index):
+    duties = ''.join(f'<li>{duty}</li>' for duty in generator.sample(DUTIES, generator.randrange(2, 5)))
+    return (f'<p><strong>Компания {index % 997}</strong> приглашает в команду.</p>'
+            f'<p><strong>Обязанности:</strong></p><ul>{duties}</ul>'
+            f'<p>Требования: опыт от {generator.randrange(1, 6)} лет, знание '
+            f'<em>{generator.choice(SKILLS)}</em> &amp; {generator.choice(SKILLS)}.</p>\n<p>Мы предлагаем:  '
+            f'официальное   оформление, ДМС.</p>')
+
+
+def generate_rows(count, seed=0, schema='full', invalid_rate=0.01):
+    generator = random.Random(seed)
+    for index in range(count):
+        salary_from = generator.randrange(10, 300) * 1000
+        name = generator.choice(PROFESSIONS) if generator.random() < 0.8 else f'Вакансия {generator.randrange(500)}'
+        published_at = f'20{generator.randrange(7, 23):02}-{generator.randrange(1, 13):02}-' \
+                       f'{generator.randrange(1, 29):02}T{generator.randrange(24):02}:00:00+0300'
+        currency = generator.choices(CURRENCIES, CURRENCY_WEIGHTS)[0]
+        area_name = generator.choices(CITIES, CITY_WEIGHTS)[0]
+        if schema == 'full':
+            row = [name, get_description(generator, index),
+                   '\n'.join(generator.sample(SKILLS, generator.randrange(1, 6))),
+                   generator.choice(EXPERIENCE_IDS), generator.choice(['True', 'False']),
+                   f'Компания {generator.randrange(5000)}', f'{salary_from}.0',
+                   f'{salary_from + generator.randrange(100) * 1000}.0', generator.choice(['True', 'False']),
+                   currency, area_name, published_at]
+        else:
+            row = [name, f'{salary_from}.0', f'{salary_from + generator.randrange(100) * 1000}.0', currency,
+                   area_name, published_at]
+        if generator.random() < invalid_rate:
+            row[generator.randrange(len(row))] = ''
+        yield row
+
+
+def generate_vacancies(file_name, count, seed=0, schema='full', invalid_rate=0.01):
+    with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(VACANCY_HEADER if schema == 'full' else PROFESSION_KEYS)
+        writer.writerows(generate_rows(count, seed, schema, invalid_rate))
+
+
+def load_legacy(file_name):
+    vacancies = []
+    with open(file_name, encoding='utf-8-sig') as file:
+        for row in csv.DictReader(file):
+            salary = LegacySalary(row['salary_from'], row['salary_to'], row['salary_gross'], row['salary_currency'])
+            vacancies.append(LegacyVacancy(row['name'], row['description'], row['key_skills'], row['experience_id'],
+                                           row['premium'], row['employer_name'], salary, row['area_name'],
+                                           row['published_at']))
+    return vacancies
+
+
+def measure_memory(function):
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size // len(result)
+
+
+def compare_memory(file_name, count=1000000):
+    generate_vacancies(file_name, count)
+    load_table(file_name)
+    print(f"Строк: {count}")
+    print(f"До: {measure_memory(lambda: load_legacy(file_name))} байт на вакансию")
+    print(f"После: {measure_memory(lambda: DataSet(file_name).csv_filer())} байт на вакансию")
+
+
+def legacy_fix_field(field):
+    return ' '.join(re.sub(re.compile(r'<[^>]+>'), '', field).split())
+
+
+def compare_formatters(file_name):
+    vacancies = DataSet(file_name).csv_filer()
+    print(f"Строк: {len(vacancies)}")
+    for field in FIELD_FORMATTERS:
+        elapsed, _ = measure(lambda: format_all(vacancies, [field]))
+        print(f"{field}: {elapsed * 1e9 / len(vacancies):.0f} нс на вакансию")
+    for name, function in [['fix_field (re.compile в каждом вызове)', legacy_fix_field], ['fix_field', fix_field]]:
+        elapsed, _ = measure(lambda: [function(vacancy.name) for vacancy in vacancies])
+        print(f"{name}, название: {elapsed * 1e9 / len(vacancies):.0f} нс на вакансию")
+        elapsed, _ = measure(lambda: [function(vacancy.description) for vacancy in vacancies])
+        print(f"{name}, описание: {elapsed * 1e9 / len(vacancies):.0f} нс на вакансию")
+
+
+def read_dict_rows(file_name):
+    with open(file_name, encoding='utf-8-sig') as file:
+        return [row for row in csv.DictReader(file) if all(row.values())]
+
+
+def read_positional_rows(file_name, columns):
+    with open_csv(file_name) as file:
+        reader = csv.reader(file)
+        return list(read_rows(reader, next(reader, []), columns, dict()))
+
+
+def compare_readers(file_name):
+    columns = read_header(file_name)[0]
+    dict_time, dict_rows = measure(lambda: read_dict_rows(file_name), 1)
+    positional_time, positional_rows = measure(lambda: read_positional_rows(file_name, columns), 1)
+    needed_time, _ = measure(lambda: read_positional_rows(file_name, PROFESSION_KEYS), 1)
+    print(f"Строк: {len(dict_rows)}")
+    print(f"DictReader: {dict_time:.3f} с")
+    print(f"csv.reader, все столбцы: {positional_time:.3f} с (x{dict_time / positional_time:.1f})")
+    print(f"csv.reader, столбцы статистики: {needed_time:.3f} с (x{dict_time / needed_time:.1f})")
+    print("Строки совпадают" if [tuple(row.values()) for row in dict_rows] == positional_rows
+          else "Строки различаются")
+
+
+def get_results(statistics):
+    return [statistics.get_year_info(statistics.years), statistics.get_year_info(statistics.profession_years),
+            statistics.get_city_info()]
+
+
+def measure(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def compare_backends(file_name, profession_name):
+    table = load_table(file_name)
+    python_time, python_statistics = measure(lambda: aggregate_table_rows(
+        table, PROFESSION_KEYS, Statistics(profession_name, get_currency_rates())))
+    numpy_time, numpy_statistics = measure(lambda: aggregate_table(
+        table, PROFESSION_KEYS, profession_name, get_currency_rates()))
+    print(f"Строк: {len(table)}")
+    print(f"python: {python_time:.3f} с")
+    print(f"numpy: {numpy_time:.3f} с (x{python_time / numpy_time:.1f})")
+    print("Результаты совпадают" if get_results(python_statistics) == get_results(numpy_statistics)
+          else "Результаты различаются")
+
+
+def run_report_stages(statistics, output_dir, results):
+    model = ReportModel.from_statistics(statistics)
+    report = Report(model, output_dir)
+    results['excel'], _ = measure(report.generate_excel, 1)
+    results['chart'], _ = measure(report.generate_image, 1)
+    if os.path.exists('result.html'):
+        try:
+            results['pdf'], _ = measure(report.generate_pdf, 1)
+        except OSError as error:
+            print(f"PDF пропущен: {error}")
+
+
+def run_suite(file_name, profession_name, result_name=None, output_dir='benchmark_output', repeat=1):
+    header = read_header(file_name)[0]
+    os.makedirs(output_dir, exist_ok=True)
+    shutil.rmtree(get_cache_dir(file_name), ignore_errors=True)
+    results = dict()
+    results['parse'], table = measure(lambda: load_table(file_name), 1)
+
+    if header == VACANCY_HEADER:
+        results['validate'], vacancies = measure(lambda: DataSet(file_name).csv_filer(), repeat)
+        results['index'], vacancy_query = measure(lambda: VacancyQuery(vacancies), repeat)
+        results['filter'], _ = measure(lambda: list(vacancy_query.filter('Навыки: Git, SQL')), repeat)
+        results['sort'], _ = measure(lambda: list(vacancy_query.sort(range(len(vacancies)), 'Оклад', True)), repeat)
+        results['format'], _ = measure(lambda: format_all(vacancies, list(FIELD_FORMATTERS)), repeat)
+
+    results['aggregate_python'], statistics = measure(lambda: aggregate_table_rows(
+        table, PROFESSION_KEYS, Statistics(profession_name, get_currency_rates())), repeat)
+    results['aggregate_numpy'], _ = measure(lambda: aggregate_table(
+        table, PROFESSION_KEYS, profession_name, get_currency_rates()), repeat)
+    run_report_stages(statistics, output_dir, results)
+
+    data = {'file_name': os.path.basename(file_name), 'rows': len(table),
+            'rejected': len(table) - int(np.count_nonzero(table.valid)), 'profession_name': profession_name,
+            'python': platform.python_version(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'stages': {stage: results[stage] for stage in BENCHMARK_STAGES if stage in results}}
+    for stage, elapsed in data['stages'].items():
+        print(f"{stage}: {elapsed:.3f} с")
+    if result_name is not None:
+        with open(result_name, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+    return data
+
+
+def compare_results(old_name, new_name, threshold=0.1):
+    with open(old_name, encoding='utf-8') as file:
+        old = json.load(file)
+    with open(new_name, encoding='utf-8') as file:
+        new = json.load(file)
+    regressions = 0
+    for stage in BENCHMARK_STAGES:
+        if stage not in old['stages'] or stage not in new['stages']:
+            continue
+        ratio = new['stages'][stage] / old['stages'][stage] if old['stages'][stage] else 1
+        mark = ' <- медленнее' if ratio > 1 + threshold else ''
+        regressions += mark != ''
+        print(f"{stage}: {old['stages'][stage]:.3f} с -> {new['stages'][stage]:.3f} с (x{ratio:.2f}){mark}")
+    return regressions
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'generate':
+        generate_vacancies(sys.argv[2], int(sys.argv[3]), int(sys.argv[5]) if len(sys.argv) > 5 else 0,
+                           sys.argv[4] if len(sys.argv) > 4 else 'full')
+    elif sys.argv[1] == 'suite':
+        run_suite(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+    elif sys.argv[1] == 'diff':
+        sys.exit(1 if compare_results(sys.argv[2], sys.argv[3]) else 0)
+    elif sys.argv[1] == 'ingest':
+        compare_readers(sys.argv[2])
+    elif sys.argv[1] == 'memory':
+        compare_memory(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 1000000)
+    elif sys.argv[1] == 'format':
+        compare_formatters(sys.argv[2])
+    else:
+        compare_backends(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else '')
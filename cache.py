@@ -0,0 +1,213 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from contextlib import ExitStack
+import numpy as np
+from ingest import BUFFER_SIZE, add_rejected, open_csv
+
+CACHE_VERSION = 3
+SAMPLE_SIZE = 1 << 20
+BLOCK_SIZE = 1 << 16
+PLAIN_COLUMNS = ['description', 'key_skills']
+
+
+def get_cache_dir(file_name):
+    return file_name + '.cache'
+
+
+def get_signature(file_name):
+    stat = os.stat(file_name)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as file:
+        digest.update(file.read(SAMPLE_SIZE))
+        if stat.st_size > SAMPLE_SIZE:
+            file.seek(max(stat.st_size - SAMPLE_SIZE, SAMPLE_SIZE))
+            digest.update(file.read())
+    return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+class Column:
+    def __init__(self, codes, blob, offsets):
+        self.codes = codes
+        self.blob = blob
+        self.offsets = offsets
+        self.vocabulary = None
+
+    def get_empty_codes(self):
+        return np.diff(np.asarray(self.offsets)) == 0
+
+    def get_vocabulary(self):
+        if self.vocabulary is None:
+            data = self.blob.tobytes()
+            offsets = self.offsets.tolist()
+            self.vocabulary = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        return self.vocabulary
+
+
+class Table:
+    def __init__(self, header, columns, valid, complete):
+        self.header = header
+        self.columns = columns
+        self.valid = valid
+        self.complete = complete
+
+    def __len__(self):
+        return len(self.valid)
+
+    def get_column(self, name):
+        return self.columns[self.header.index(name)]
+
+    def get_valid(self, columns, rejected=None, validators=None):
+        valid = np.array(self.complete, dtype=np.bool_)
+        if rejected is not None and not valid.all():
+            add_rejected(rejected, 'short_row', len(valid) - int(np.count_nonzero(valid)))
+        for name in columns:
+            column = self.get_column(name)
+            empty = valid & column.get_empty_codes()[np.asarray(column.codes)]
+            count = int(np.count_nonzero(empty))
+            if count:
+                valid &= ~empty
+                if rejected is not None:
+                    add_rejected(rejected, f'empty:{name}', count)
+        for name in columns:
+            if validators is None or name not in validators:
+                continue
+            column = self.get_column(name)
+            bad_codes = np.array([not validators[name](value) for value in column.get_vocabulary()], dtype=np.bool_)
+            invalid = valid & bad_codes[np.asarray(column.codes)]
+            count = int(np.count_nonzero(invalid))
+            if count:
+                valid &= ~invalid
+                if rejected is not None:
+                    add_rejected(rejected, f'invalid:{name}', count)
+        return valid
+
+    def get_rows(self, valid=None, names=None):
+        columns = self.columns if names is None else [self.get_column(name) for name in names]
+        vocabularies = [column.get_vocabulary() for column in columns]
+        valid = self.valid if valid is None else valid
+        for start in range(0, len(valid), BLOCK_SIZE):
+            end = start + BLOCK_SIZE
+            blocks = [column.codes[start:end][valid[start:end]].tolist() for column in columns]
+            for codes in zip(*blocks):
+                yield [vocabulary[code] for vocabulary, code in zip(vocabularies, codes)]
+
+
+def write_columns(file_name, temp_dir):
+    with open_csv(file_name) as file, ExitStack() as stack:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        blobs = [stack.enter_context(open(os.path.join(temp_dir, f'{index}.blob.bin'), 'wb', buffering=BUFFER_SIZE))
+                 if name in PLAIN_COLUMNS else None for index, name in enumerate(header)]
+        vocabularies = [dict() if blob is None else array('q', [0]) for blob in blobs]
+        codes = [array('i') for _ in header]
+        valid = array('b')
+        complete = array('b')
+        for row in reader:
+            if len(row) == 0:
+                continue
+            complete.append(len(row) >= len(header))
+            row = row[:len(header)] + [''] * (len(header) - len(row))
+            valid.append(all(row))
+            for vocabulary, column, blob, value in zip(vocabularies, codes, blobs, row):
+                if blob is not None:
+                    encoded = value.encode('utf-8')
+                    blob.write(encoded)
+                    column.append(len(vocabulary) - 1)
+                    vocabulary.append(vocabulary[-1] + len(encoded))
+                    continue
+                code = vocabulary.get(value)
+                if code is None:
+                    code = vocabulary[value] = len(vocabulary)
+                column.append(code)
+
+    for index, (vocabulary, column) in enumerate(zip(vocabularies, codes)):
+        if isinstance(vocabulary, array):
+            offsets = np.frombuffer(vocabulary, dtype=np.int64)
+        else:
+            encoded = [value.encode('utf-8') for value in vocabulary]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            np.save(os.path.join(temp_dir, f'{index}.blob.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(os.path.join(temp_dir, f'{index}.codes.npy'), np.frombuffer(column, dtype=np.int32))
+        np.save(os.path.join(temp_dir, f'{index}.offsets.npy'), offsets)
+    np.save(os.path.join(temp_dir, 'valid.npy'), np.frombuffer(valid, dtype=np.bool_))
+    np.save(os.path.join(temp_dir, 'complete.npy'), np.frombuffer(complete, dtype=np.bool_))
+    with open(os.path.join(temp_dir, 'meta.json'), 'w', encoding='utf-8') as file:
+        json.dump({'signature': get_signature(file_name), 'header': header}, file, ensure_ascii=False)
+
+
+def write_table(file_name, cache_dir):
+    temp_dir = tempfile.mkdtemp(prefix=os.path.basename(cache_dir) + '.', suffix='.tmp',
+                                dir=os.path.dirname(os.path.abspath(cache_dir)))
+    try:
+        write_columns(file_name, temp_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    if is_fresh(file_name, cache_dir):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return
+    old_dir = temp_dir + '.old'
+    if os.path.exists(cache_dir):
+        os.replace(cache_dir, old_dir)
+    try:
+        os.replace(temp_dir, cache_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if not is_fresh(file_name, cache_dir):
+            raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_blob(cache_dir, index):
+    file_name = os.path.join(cache_dir, f'{index}.blob.bin')
+    if not os.path.exists(file_name):
+        return np.load(os.path.join(cache_dir, f'{index}.blob.npy'), mmap_mode='r')
+    if os.path.getsize(file_name) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(file_name, dtype=np.uint8, mode='r')
+
+
+def read_table(cache_dir):
+    with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as file:
+        header = json.load(file)['header']
+    columns = [Column(np.load(os.path.join(cache_dir, f'{index}.codes.npy'), mmap_mode='r'),
+                      load_blob(cache_dir, index),
+                      np.load(os.path.join(cache_dir, f'{index}.offsets.npy'), mmap_mode='r'))
+               for index in range(len(header))]
+    return Table(header, columns, *[np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+                                    for name in ['valid', 'complete']])
+
+
+def is_fresh(file_name, cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as file:
+            return json.load(file)['signature'] == get_signature(file_name)
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def build_table(file_name, cache_dir):
+    try:
+        write_table(file_name, cache_dir)
+    except OSError:
+        return False
+    return True
+
+
+def load_table(file_name, build=True):
+    cache_dir = get_cache_dir(file_name)
+    if not is_fresh(file_name, cache_dir):
+        if not build or not build_table(file_name, cache_dir):
+            return None
+    try:
+        return read_table(cache_dir)
+    except OSError:
+        if not build or not build_table(file_name, cache_dir):
+            return None
+        return read_table(cache_dir)
@@ -0,0 +1,63 @@
+import csv
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from functools import lru_cache
+import numpy as np
+
+CURRENCIES = ["AZN", "BYR", "EUR", "GEL", "KGS", "KZT", "RUR", "UAH", "USD", "UZS"]
+DEFAULT_RATES = [35.68, 23.91, 59.90, 21.74, 0.76, 0.13, 1, 1.64, 60.66, 0.0055]
+RATES_FILE = 'currency_rates.csv'
+
+
+class CurrencyRates:
+    def __init__(self, dates, currencies, values):
+        self.dates = dates
+        self.currencies = {currency: index for index, currency in enumerate(currencies)}
+        self.values = values
+        self.find_rate = lru_cache(maxsize=1 << 16)(self.find_rate)
+
+    def __reduce__(self):
+        return CurrencyRates, (self.dates, list(self.currencies), self.values)
+
+    def find_rate(self, currency, date):
+        index = max(bisect_right(self.dates, date) - 1, 0)
+        return self.values[index * len(self.currencies) + self.currencies[currency]]
+
+    def get_signature(self):
+        data = json.dumps([self.dates, list(self.currencies), self.values])
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_rate(self, currency, date):
+        return self.find_rate(currency, date[:10])
+
+    def get_date_indexes(self, dates):
+        dates = np.asarray(dates, dtype='U10')
+        return np.maximum(np.searchsorted(np.array(self.dates, dtype='U10'), dates, side='right') - 1, 0)
+
+
+def read_rate_rows(file_name):
+    with open(file_name, encoding='utf-8-sig') as file:
+        if file_name.endswith('.json'):
+            return sorted(json.load(file).items())
+        return sorted((row.pop('date'), row) for row in csv.DictReader(file))
+
+
+def load_rates(file_name=RATES_FILE):
+    if not os.path.exists(file_name):
+        return CurrencyRates([''], CURRENCIES, list(DEFAULT_RATES))
+    dates = []
+    values = []
+    previous = list(DEFAULT_RATES)
+    for date, rates in read_rate_rows(file_name):
+        previous = [float(rates[currency]) if rates.get(currency) not in [None, ''] else rate
+                    for currency, rate in zip(CURRENCIES, previous)]
+        dates.append(date[:10])
+        values.extend(previous)
+    return CurrencyRates(dates or [''], CURRENCIES, values or list(DEFAULT_RATES))
+
+
+@lru_cache(maxsize=None)
+def get_currency_rates(file_name=None):
+    return load_rates(file_name if file_name is not None else RATES_FILE)
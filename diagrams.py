@@ -1,197 +1,253 @@
-import csv
 import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 import numpy as np
-import openpyxl
-import pandas as pd
-from openpyxl.styles import Font
-from openpyxl.styles.borders import Border, Side
-from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
-from matplotlib import pyplot as plt
-import pdfkit
-from jinja2 import Environment, FileSystemLoader
-
-def create_table(work_sheet, tags, collection, index_table, is_percent):
+from aggregation import aggregate_file, aggregate_table_rows, create_statistics
+from cache import load_table
+from currency import get_currency_rates
+from incremental import update_store
+from instrumentation import tracer
+from vectorized import VECTORIZE_THRESHOLD, aggregate_table
+
+WKHTMLTOPDF_WINDOWS = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
+ARTIFACTS = {'excel': [], 'image': [], 'pdf': ['image']}
+PROFESSION_KEYS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+
+def get_table_rows(tables, size, height):
+    for row_index in range(height):
+        row = [None] * size
+        for index, _, collection, _ in tables:
+            for offset, column in enumerate(collection):
+                if row_index < len(column):
+                    row[index + offset - 1] = column[row_index]
+        yield row
+
+
+def create_sheet(book, title, tables):
+    from openpyxl.styles import Font
+    from openpyxl.styles.borders import Border, Side
+    from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
+    from openpyxl.utils import get_column_letter
     side = Side(style='thin')
     border = Border(left=side, right=side, top=side, bottom=side)
-    for index in range(len(tags)):
-        work_sheet.cell(row=1, column=index + index_table).value = tags[index]
-        work_sheet.cell(row=1, column=index + index_table).font = Font(bold=True)
-        work_sheet.cell(row=1, column=index + index_table).border = border
-    for element in collection:
-        for index in range(len(element)):
-            work_sheet.cell(row=index + 2, column=collection.index(element) + index_table).value = element[index]
-            work_sheet.cell(row=index + 2, column=collection.index(element) + index_table).border = border
-            if is_percent:
-                work_sheet.cell(row=index + 2,
-                                column=collection.index(element) + 4).number_format = FORMAT_PERCENTAGE_00
-    return fix_width_table(work_sheet, is_percent)
-
-
-def fix_width_table(work_sheet, is_second_table):
-    dims = {}
-    for row in work_sheet.rows:
-        for cell in row:
-            dims[cell.column_letter] = max((dims.get(cell.column_letter, 0), len(str(cell.value))))
-    if is_second_table:
-        dims['C'] = 0
-    for key, width in dims.items():
-        work_sheet.column_dimensions[key].width = width + 2
-    return work_sheet
+    font = Font(bold=True)
+    size = max(index + len(tags) - 1 for index, tags, _, _ in tables)
+    height = max(len(column) for _, _, collection, _ in tables for column in collection)
+    header = [None] * size
+    formats = [None] * size
+    for index, tags, _, is_percent in tables:
+        for offset, tag in enumerate(tags):
+            header[index + offset - 1] = tag
+            formats[index + offset - 1] = FORMAT_PERCENTAGE_00 if is_percent else None
+
+    dims = [len(str(value)) for value in header]
+    for row in get_table_rows(tables, size, height):
+        dims = [max(width, len(str(value))) for width, value in zip(dims, row)]
+    work_sheet = book.create_sheet(title)
+    for index, width in enumerate(dims):
+        work_sheet.column_dimensions[get_column_letter(index + 1)].width = (width if header[index] else 0) + 2
+
+    header_style = create_style(work_sheet, border, font=font)
+    styles = [create_style(work_sheet, border, number_format=number_format) for number_format in formats]
+    work_sheet.append([create_cell(work_sheet, value, header_style) for value in header])
+    for row in get_table_rows(tables, size, height):
+        work_sheet.append([create_cell(work_sheet, value, style) for value, style in zip(row, styles)])
+
+
+def create_style(work_sheet, border, font=None, number_format=None):
+    from openpyxl.cell import WriteOnlyCell
+    cell = WriteOnlyCell(work_sheet)
+    cell.border = border
+    if font is not None:
+        cell.font = font
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell._style
+
+
+def create_cell(work_sheet, value, style):
+    from openpyxl.cell import WriteOnlyCell
+    if value is None:
+        return None
+    cell = WriteOnlyCell(work_sheet, value)
+    cell._style = copy(style)
+    return cell
+
+
+def aggregate_data(file_name, profession_keys, profession_name, currency_rates, use_cache=True, workers=1,
+                   backend='auto'):
+    table = load_table(file_name, build=workers <= 1) if use_cache else None
+    if table is None:
+        return aggregate_file(file_name, profession_keys, profession_name, currency_rates, workers)
+    if backend == 'numpy' or backend == 'auto' and len(table) >= VECTORIZE_THRESHOLD:
+        return aggregate_table(table, profession_keys, profession_name, currency_rates)
+    return aggregate_table_rows(table, profession_keys, create_statistics(profession_name, currency_rates))
 
 
 class DataSet:
-    def __init__(self):
-        self.file_name = input("Введите название файла: ")
-        self.profession_name = input("Введите название профессии: ")
-        currency_name = ["AZN", "BYR", "EUR", "GEL", "KGS", "KZT", "RUR", "UAH", "USD", "UZS"]
-        currency_value = [35.68, 23.91, 59.90, 21.74, 0.76, 0.13, 1, 1.64, 60.66, 0.0055]
-        self.currency_to_rub = dict(zip(currency_name, currency_value))
-        self.professions = []
+    def __init__(self, workers=1, use_cache=True, backend='auto', store_name=None, file_name=None,
+                 profession_name=None, rates_name=None):
+        self.file_name = file_name if file_name is not None else input("Введите название файла: ")
+        self.profession_name = profession_name if profession_name is not None \
+            else input("Введите название профессии: ")
+        self.currency_rates = get_currency_rates(rates_name)
+        self.profession_keys = PROFESSION_KEYS
+        self.statistics = None
+        self.workers = workers
+        self.use_cache = use_cache
+        self.backend = backend
+        self.store_name = store_name
         self.year_collection = []
         self.city_collection = []
 
     def get_correct_data(self):
-        with open(self.file_name, encoding='utf-8-sig') as file:
-            for row in csv.DictReader(file):
-                correct_row = True
-                for field in row:
-                    if row[field] is None or len(row[field]) == 0:
-                        correct_row = False
-                        continue
-                if correct_row:
-                    self.professions.append(Profession(*[row[field] for field in row]))
+        if self.store_name is not None:
+            if isinstance(self.profession_name, list):
+                raise ValueError("Хранилище статистики собирается для одной профессии")
+            self.statistics = update_store(self.store_name, [self.file_name], self.profession_keys,
+                                           self.profession_name, self.currency_rates)
+            return
+        self.statistics = aggregate_data(self.file_name, self.profession_keys, self.profession_name,
+                                         self.currency_rates, self.use_cache, self.workers, self.backend)
 
     def get_info(self):
-        salary_dict = dict()
-        count_dict = dict()
-        for profession in self.professions:
-            profession.salary_from = int(str(profession.salary_from).replace('.0', ''))
-            profession.salary_to = int(str(profession.salary_to).replace('.0', ''))
-            if profession.get_year() not in salary_dict.keys():
-                salary_dict[profession.get_year()] = []
-            salary_dict[profession.get_year()].append((profession.salary_from + profession.salary_to) // 2
-                                                      * self.currency_to_rub[profession.salary_currency])
-        for key, value in salary_dict.items():
-            salary_dict[key] = int(str((sum(value) // len(value))).replace('.0', ''))
-            count_dict[key] = len(value)
+        salary_dict, count_dict = self.statistics.get_year_info(self.statistics.years)
         print("Динамика уровня зарплат по годам:", salary_dict)
         print('Динамика количества вакансий по годам:', count_dict)
         self.year_collection.append(salary_dict)
         self.year_collection.append(count_dict)
 
     def get_info_professions(self):
-        salary_dict = dict()
-        count_dict = dict()
-        for profession in self.professions:
-            if profession.get_year() not in salary_dict.keys():
-                salary_dict[profession.get_year()] = []
-            if self.profession_name in profession.name:
-                profession.salary_from = int(str(profession.salary_from).replace('.0', ''))
-                profession.salary_to = int(str(profession.salary_to).replace('.0', ''))
-                salary_dict[profession.get_year()].append((profession.salary_from + profession.salary_to) // 2
-                                                          * self.currency_to_rub[profession.salary_currency])
-        for key, value in salary_dict.items():
-            if len(value) != 0:
-                salary_dict[key] = int(str((sum(value) // len(value))).replace('.0', ''))
-                count_dict[key] = len(value)
-            else:
-                salary_dict[key] = 0
-                count_dict[key] = 0
-
+        salary_dict, count_dict = self.statistics.get_year_info(self.statistics.profession_years)
         print("Динамика уровня зарплат по годам для выбранной профессии:", salary_dict)
         print('Динамика количества вакансий по годам для выбранной профессии:', count_dict)
         self.year_collection.append(salary_dict)
         self.year_collection.append(count_dict)
 
     def get_info_cities(self):
-        city_dict = dict()
-        ans_dict = dict()
-        count_vacancy = 0
-        for profession in self.professions:
-            profession.salary_from = int(str(profession.salary_from).replace('.0', ''))
-            profession.salary_to = int(str(profession.salary_to).replace('.0', ''))
-            if profession.area_name not in city_dict.keys():
-                city_dict[profession.area_name] = []
-            city_dict[profession.area_name].append((profession.salary_from + profession.salary_to) // 2
-                                                   * self.currency_to_rub[profession.salary_currency])
-            count_vacancy += 1
-        percent_dict = dict()
-        for key, value in city_dict.items():
-            if len(value) >= count_vacancy // 100:
-                ans_dict[key] = int(str((sum(value) // len(value))).replace('.0', ''))
-                percent_dict[key] = round(len(value) / count_vacancy, 4)
-        ans_dict = dict(sorted(ans_dict.items(), key=lambda item: item[1], reverse=True)[:10])
-        percent_dict = dict(sorted(percent_dict.items(), key=lambda item: item[1], reverse=True)[:10])
+        ans_dict, percent_dict = self.statistics.get_city_info()
         print('Уровень зарплат по городам (в порядке убывания):', ans_dict)
         print('Доля вакансий по городам (в порядке убывания):', percent_dict)
         self.city_collection.append(ans_dict)
         self.city_collection.append(percent_dict)
 
-    def get_general_info(self):
-        self.get_correct_data()
-        self.get_info()
-        self.get_info_professions()
-        self.get_info_cities()
-
+    def count_rows(self):
+        count_rejected = sum(self.statistics.rejected.values())
+        tracer.count('rows_read', self.statistics.count_vacancy + count_rejected)
+        tracer.count('rows_rejected', count_rejected)
+        for reason, count in self.statistics.rejected.items():
+            tracer.count(f'rejected:{reason}', count)
+        if isinstance(self.profession_name, list):
+            tracer.count('rows_matched', sum(accumulator.count for years in self.statistics.professions_years
+                                             for accumulator in years.values()))
+        else:
+            tracer.count('rows_matched', sum(accumulator.count for accumulator in
+                                             self.statistics.profession_years.values()))
 
-class Profession:
-    def __init__(self, name, salary_from, salary_to, salary_currency, area_name, published_at):
-        self.name = name
-        self.salary_from = int(salary_from.replace('.0', ''))
-        self.salary_to = int(salary_to.replace('.0', ''))
-        self.salary_currency = salary_currency
-        self.area_name = area_name
-        self.published_at = published_at
-
-    def get_year(self):
-        return int(self.published_at[:4])
+    def get_general_info(self):
+        with tracer.stage('aggregate'):
+            self.get_correct_data()
+        if tracer.enabled:
+            self.count_rows()
+        with tracer.stage('summary'):
+            self.get_info()
+            self.get_info_professions()
+            self.get_info_cities()
+
+
+class ReportModel:
+    def __init__(self, profession_name, year_collection, city_collection):
+        self.profession_name = profession_name
+        salaries, counts, profession_salaries, profession_counts = year_collection
+        self.year_names = ["Год", "Средняя зарплата", f"Средняя зарплата - {profession_name}",
+                           "Количество вакансий", f"Количество вакансий - {profession_name}"]
+        self.year_columns = [list(salaries.keys()), list(salaries.values()), list(profession_salaries.values()),
+                             list(counts.values()), list(profession_counts.values())]
+        self.level_names = ["Город", "Уровень зарплат"]
+        self.level_columns = [list(city_collection[0].keys()), list(city_collection[0].values())]
+        self.fraction_names = ["Город", "Доля вакансий"]
+        self.fraction_columns = [list(city_collection[1].keys()), list(city_collection[1].values())]
+
+    @staticmethod
+    def from_statistics(statistics):
+        return ReportModel(statistics.profession_name, [*statistics.get_year_info(statistics.years),
+                                                        *statistics.get_year_info(statistics.profession_years)],
+                           statistics.get_city_info())
+
+    @staticmethod
+    def from_batch(statistics):
+        year_info = statistics.get_year_info(statistics.years)
+        city_info = statistics.get_city_info()
+        return [ReportModel(profession_name, [*year_info, *statistics.get_year_info(
+            statistics.get_profession_years(index))], city_info)
+                for index, profession_name in enumerate(statistics.profession_names)]
+
+    def get_html_tables(self):
+        import pandas as pd
+        fraction_columns = [self.fraction_columns[0], [value * 100 for value in self.fraction_columns[1]]]
+        return [pd.DataFrame(dict(zip(names, columns))).to_html(index=False)
+                for names, columns in [[self.year_names, self.year_columns], [self.level_names, self.level_columns],
+                                       [self.fraction_names, fraction_columns]]]
+
+
+def render_pdf(html, file_name, backend='wkhtmltopdf', wkhtmltopdf=None):
+    if backend == 'weasyprint':
+        from weasyprint import HTML
+        HTML(string=html, base_url='.').write_pdf(file_name)
+        return
+    import pdfkit
+    path = wkhtmltopdf or os.environ.get('WKHTMLTOPDF') or shutil.which('wkhtmltopdf') or WKHTMLTOPDF_WINDOWS
+    config = pdfkit.configuration(wkhtmltopdf=path)
+    pdfkit.from_string(html, file_name, configuration=config, options={"enable-local-file-access": ""})
 
 
 class Report:
-    def __init__(self, data):
-        self.book = openpyxl.Workbook()
-        self.sheet = self.book.active
-        self.sheet.title = "Статистика по годам"
-        self.second_sheet = self.book.create_sheet('Статистика по городам')
-        self.data = data
-        self.year_collection = data.year_collection
-        self.city_collection = data.city_collection
+    def __init__(self, model, output_dir='.', pdf_backend='wkhtmltopdf', wkhtmltopdf=None):
+        self.model = model
+        self.output_dir = output_dir
+        self.pdf_backend = pdf_backend
+        self.wkhtmltopdf = wkhtmltopdf
+
+    def get_path(self, file_name):
+        return os.path.join(self.output_dir, file_name)
 
     def generate_excel(self):
-        collection_level = [list(self.city_collection[0].keys())] + [list(self.city_collection[0].values())]
-        collection_fraction = [list(self.city_collection[1].keys())] + [list(self.city_collection[1].values())]
-        collection_years = [list(self.year_collection[0].keys())]
-        [collection_years.append(list(data.values())) for data in self.year_collection]
-        collection_years = [collection_years[0]] + [collection_years[1]] + [collection_years[3]] + \
-                           [collection_years[2]] + [collection_years[4]]
-        names = ["Год", "Средняя зарплата", f"Средняя зарплата - {self.data.profession_name}",
-                 "Количество вакансий", f"Количество вакансий - {self.data.profession_name}"]
-        self.sheet = create_table(self.sheet, names, collection_years, 1, False)
-        self.second_sheet = create_table(self.second_sheet, ["Город", "Уровень зарплат"], collection_level, 1, False)
-        self.second_sheet = create_table(self.second_sheet, ["Город", "Доля вакансий"], collection_fraction, 4, True)
-        self.book.save("report.xlsx")
-        self.book.close()
+        import openpyxl
+        model = self.model
+        book = openpyxl.Workbook(write_only=True)
+        create_sheet(book, "Статистика по годам", [[1, model.year_names, model.year_columns, False]])
+        create_sheet(book, "Статистика по городам", [[1, model.level_names, model.level_columns, False],
+                                                     [4, model.fraction_names, model.fraction_columns, True]])
+        book.save(self.get_path("report.xlsx"))
+        book.close()
 
     def generate_image(self):
-        figure, axis = plt.subplots(2, 2)
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        axis = figure.subplots(2, 2)
         width = 0.4
-        profession = self.data.profession_name.lower()
-        self.city_collection[1]['Другие'] = 1 - sum(list(self.city_collection[1].values()))
+        model = self.model
+        profession = model.profession_name.lower()
 
-        salary_and_vacancy_year_x = list(self.year_collection[0].keys())
-        salary_year_y = list(self.year_collection[0].values())
-        salary_year_profession_y = list(self.year_collection[2].values())
+        salary_and_vacancy_year_x = model.year_columns[0]
+        salary_year_y = model.year_columns[1]
+        salary_year_profession_y = model.year_columns[2]
 
-        vacancy_year_y = list(self.year_collection[1].values())
-        vacancy_year_profession_y = list(self.year_collection[3].values())
+        vacancy_year_y = model.year_columns[3]
+        vacancy_year_profession_y = model.year_columns[4]
         x = np.arange(len(salary_and_vacancy_year_x))
 
-        salary_city_y = [x.replace(' ', '\n').replace('-', '-\n') for x in list(self.city_collection[0].keys())]
-        salary_city_x = list(self.city_collection[0].values())
-
-        vacancy_city_values = list(self.city_collection[1].values())
-        vacancy_city_labels = list(self.city_collection[1].keys())
+        salary_city_y = [x.replace(' ', '\n').replace('-', '-\n') for x in model.level_columns[0]]
+        salary_city_x = model.level_columns[1]
 
+        vacancy_city_values = model.fraction_columns[1] + [1 - sum(model.fraction_columns[1])]
+        vacancy_city_labels = model.fraction_columns[0] + ['Другие']
         axis[0, 0].bar(x - width/2, salary_year_y, width)
         axis[0, 0].bar(x + width / 2, salary_year_profession_y, width)
         axis[0, 0].set_xticks(x, salary_and_vacancy_year_x)
@@ -222,41 +278,131 @@ class Report:
         axis[1, 1].set_title("Доля вакансий по городам")
         axis[1, 1].plot()
 
-        plt.tight_layout()
-        plt.savefig('graph.png')
+        figure.tight_layout()
+        figure.savefig(self.get_path('graph.png'))
+        figure.clear()
 
     def generate_pdf(self):
-        path = r'Путь к html'
-        path_second = r'Путь к шаблону 2'
-        path_third = r'Путь к шаблону 3'
-        excel_path = r'Путь к exel'
-
-        first_table = pd.read_excel(excel_path)
-        second_table = pd.read_excel(excel_path,
-                                     sheet_name='Статистика по городам').iloc[:, [True, True, False, False, False]]
-        third_table = pd.read_excel(excel_path,
-                                    sheet_name='Статистика по городам').iloc[:, [False, False, False, True, True]]
-        third_table.columns = ['Город', 'Доля вакансий']
-        third_table['Доля вакансий'] = third_table['Доля вакансий'] * 100
-
-        [table.to_html(element, index=False) for table, element in [[first_table, path], [second_table, path_second],
-                                                                    [third_table, path_third]]]
+        from jinja2 import Environment, FileSystemLoader
+        first_table, second_table, third_table = self.model.get_html_tables()
         template = Environment(loader=FileSystemLoader('.')).get_template("result.html")
-        pdf_template = template.render({'name': self.data.profession_name,
-                                        'first_table': open(path, 'r', encoding='utf-8-sig').read(),
-                                        'second_table': open(path_second, 'r', encoding='utf-8-sig').read(),
-                                        'third_table': open(path_third, 'r', encoding='utf-8-sig').read()})
-
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
-        [os.remove(element) for element in [path, path_second, path_third]]
-
-
-def execute():
-    data_professions = DataSet()
+        pdf_template = template.render({'name': self.model.profession_name, 'first_table': first_table,
+                                        'second_table': second_table, 'third_table': third_table,
+                                        'graph': os.path.abspath(self.get_path('graph.png'))})
+        render_pdf(pdf_template, self.get_path('report.pdf'), self.pdf_backend, self.wkhtmltopdf)
+
+    def submit(self, executor, artifacts, timings):
+        generators = {'excel': self.generate_excel, 'image': self.generate_image, 'pdf': self.generate_pdf}
+        futures = dict()
+        for name in get_artifacts(artifacts):
+            dependencies = [futures[dependency] for dependency in ARTIFACTS[name]]
+            futures[name] = executor.submit(run_stage, name, generators[name], dependencies, timings)
+        return list(futures.values())
+
+    def generate(self, artifacts=tuple(ARTIFACTS), workers=len(ARTIFACTS)):
+        timings = dict()
+        with ThreadPoolExecutor(get_stage_workers(workers)) as executor:
+            for future in self.submit(executor, artifacts, timings):
+                future.result()
+        return timings
+
+
+def generate_combined_excel(models, file_name):
+    import openpyxl
+    year_names = ["Год", "Средняя зарплата", "Количество вакансий"]
+    year_columns = [models[0].year_columns[0], models[0].year_columns[1], models[0].year_columns[3]]
+    for model in models:
+        year_names += [model.year_names[2], model.year_names[4]]
+        year_columns += [model.year_columns[2], model.year_columns[4]]
+    book = openpyxl.Workbook(write_only=True)
+    create_sheet(book, "Статистика по годам", [[1, year_names, year_columns, False]])
+    create_sheet(book, "Статистика по городам", [[1, models[0].level_names, models[0].level_columns, False],
+                                                 [4, models[0].fraction_names, models[0].fraction_columns, True]])
+    book.save(file_name)
+    book.close()
+
+
+def get_report_dir(output_dir, profession_name):
+    return os.path.join(output_dir, re.sub(r'[\\/:*?"<>|]', '_', profession_name).strip() or '_')
+
+
+def get_report_dirs(output_dir, profession_names):
+    report_dirs = []
+    used = set()
+    for profession_name in profession_names:
+        report_dir = base_dir = get_report_dir(output_dir, profession_name)
+        index = 1
+        while os.path.normcase(report_dir).lower() in used:
+            index += 1
+            report_dir = f'{base_dir}_{index}'
+        used.add(os.path.normcase(report_dir).lower())
+        report_dirs.append(report_dir)
+    return report_dirs
+
+
+def get_artifacts(names):
+    artifacts = []
+    for name in names:
+        for artifact in get_artifacts(ARTIFACTS[name]) + [name]:
+            if artifact not in artifacts:
+                artifacts.append(artifact)
+    return artifacts
+
+
+def get_stage_workers(workers):
+    return 1 if tracer.enabled and tracer.memory else workers
+
+
+def run_stage(name, generator, dependencies, timings):
+    for dependency in dependencies:
+        dependency.result()
+    start = time.perf_counter()
+    with tracer.stage(name):
+        generator()
+    timings[name] = time.perf_counter() - start
+
+
+def write_batch_reports(models, output_dir, combined=False, artifacts=tuple(ARTIFACTS), workers=1,
+                        pdf_backend='wkhtmltopdf'):
+    os.makedirs(output_dir, exist_ok=True)
+    if combined:
+        generate_combined_excel(models, os.path.join(output_dir, 'report.xlsx'))
+        return
+    futures = []
+    with ThreadPoolExecutor(get_stage_workers(max(workers, len(ARTIFACTS)))) as executor:
+        for model, report_dir in zip(models, get_report_dirs(output_dir, [model.profession_name for model in models])):
+            os.makedirs(report_dir, exist_ok=True)
+            futures += Report(model, report_dir, pdf_backend).submit(executor, artifacts, dict())
+        for future in futures:
+            future.result()
+
+
+def execute(workers=1, use_cache=True, backend='auto', store_name=None, artifacts=tuple(ARTIFACTS), file_name=None,
+            profession_name=None, output_dir='.', pdf_backend='wkhtmltopdf', rates_name=None):
+    data_professions = DataSet(workers, use_cache, backend, store_name, file_name, profession_name, rates_name)
+    start = time.perf_counter()
     data_professions.get_general_info()
-
-    report = Report(data_professions)
-    report.generate_excel()
-    report.generate_image()
-    report.generate_pdf()
+    timings = {'statistics': time.perf_counter() - start}
+    model = ReportModel(data_professions.profession_name, data_professions.year_collection,
+                        data_professions.city_collection)
+    os.makedirs(output_dir, exist_ok=True)
+    timings.update(Report(model, output_dir, pdf_backend).generate(artifacts))
+    return timings
+
+
+def execute_batch(file_name, profession_names, output_dir='reports', combined=False, workers=1, use_cache=True,
+                  backend='auto', artifacts=tuple(ARTIFACTS), pdf_backend='wkhtmltopdf', rates_name=None):
+    data_professions = DataSet(workers, use_cache, backend, file_name=file_name,
+                               profession_name=list(dict.fromkeys(profession_names)), rates_name=rates_name)
+    start = time.perf_counter()
+    with tracer.stage('aggregate'):
+        data_professions.get_correct_data()
+    if tracer.enabled:
+        data_professions.count_rows()
+    models = ReportModel.from_batch(data_professions.statistics)
+    timings = {'statistics': time.perf_counter() - start}
+
+    start = time.perf_counter()
+    write_batch_reports(models, output_dir, combined, artifacts, workers, pdf_backend)
+    timings['reports'] = time.perf_counter() - start
+    return timings
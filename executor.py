@@ -1,10 +1,156 @@
-import diagrams
-import statistic
-
-value = input()
-if value == "Вакансии":
-    statistic.execute()
-elif value == "Статистика":
-    diagrams.execute()
-else:
-    print("Некорректный ввод")
+import argparse
+import os
+import sys
+import time
+
+ARTIFACT_NAMES = ['excel', 'image', 'pdf']
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Таблица вакансий и статистика по профессиям")
+    parser.add_argument('--trace', help="Записать время, память и счётчики этапов в JSON-файл")
+    parser.add_argument('--trace-memory', action='store_true', help="Измерять пиковую память этапов")
+    parser.add_argument('--profile', help="Записать профиль cProfile в файл pstats")
+    parser.add_argument('--rates', help="CSV- или JSON-файл курсов валют (по умолчанию currency_rates.csv)")
+    subparsers = parser.add_subparsers(dest='mode')
+
+    vacancies = subparsers.add_parser('vacancies', help="Вывести таблицу вакансий")
+    vacancies.add_argument('file_name', help="CSV-файл с вакансиями")
+    vacancies.add_argument('--filter', default='', help="Параметр фильтрации, например «Навыки: Git»")
+    vacancies.add_argument('--sort', default='', help="Параметр сортировки")
+    vacancies.add_argument('--reverse', action='store_true', help="Обратный порядок сортировки")
+    vacancies.add_argument('--range', default='', help="Диапазон вывода, например «10 20»")
+    vacancies.add_argument('--columns', default='', help="Требуемые столбцы через «, »")
+
+    statistics = subparsers.add_parser('statistics', help="Собрать статистику и отчёты по профессиям")
+    statistics.add_argument('file_name', help="CSV-файл с вакансиями")
+    statistics.add_argument('professions', nargs='+', help="Названия профессий")
+    statistics.add_argument('--output-dir', default='.', help="Каталог для отчётов")
+    statistics.add_argument('--artifacts', nargs='*', choices=ARTIFACT_NAMES, default=ARTIFACT_NAMES,
+                            help="Какие файлы отчёта строить")
+    statistics.add_argument('--combined', action='store_true', help="Одна общая книга Excel для всех профессий")
+    statistics.add_argument('--workers', type=int, default=1, help="Число процессов для чтения CSV")
+    statistics.add_argument('--backend', choices=['auto', 'python', 'numpy'], default='auto')
+    statistics.add_argument('--no-cache', action='store_true', help="Не использовать колоночный кэш")
+    statistics.add_argument('--store', help="Файл хранилища для инкрементального пересчёта")
+    statistics.add_argument('--pdf-backend', choices=['wkhtmltopdf', 'weasyprint'], default='wkhtmltopdf')
+    statistics.add_argument('--timings', action='store_true', help="Вывести время этапов")
+    statistics.add_argument('--approximate', type=float, metavar='FRACTION',
+                            help="Оценить статистику по случайной доле файла, например 0.05")
+    statistics.add_argument('--sample', help="Оценить статистику по готовой выборке (см. команду sample)")
+    statistics.add_argument('--seed', type=int, default=0, help="Зерно генератора выборки")
+    statistics.add_argument('--confidence', type=float, default=0.95, help="Уровень доверительных интервалов")
+
+    sample = subparsers.add_parser('sample', help="Построить стратифицированную по годам выборку")
+    sample.add_argument('file_name', help="CSV-файл с вакансиями")
+    sample.add_argument('sample_name', help="Файл выборки")
+    sample.add_argument('--size', type=int, default=1000, help="Число строк на каждый год")
+    sample.add_argument('--seed', type=int, default=0, help="Зерно генератора выборки")
+    return parser
+
+
+def check_arguments(parser, args):
+    if args.trace_memory and args.trace is None:
+        parser.error("--trace-memory имеет смысл только вместе с --trace")
+    if args.mode != 'statistics':
+        return
+    is_batch = len(args.professions) > 1 or args.combined
+    is_approximate = args.approximate is not None or args.sample is not None
+    if args.store is not None and is_batch:
+        parser.error("--store поддерживается только для одной профессии без --combined")
+    if args.approximate is not None and args.sample is not None:
+        parser.error("--approximate и --sample нельзя задавать одновременно")
+    if is_approximate and (is_batch or args.store is not None):
+        parser.error("--approximate и --sample поддерживаются только для одной профессии без --combined и --store")
+    if args.backend == 'numpy' and args.no_cache:
+        parser.error("--backend numpy работает только с колоночным кэшем, уберите --no-cache")
+    if args.workers > 1 and args.store is not None:
+        parser.error("--workers не поддерживается вместе с --store")
+
+
+def run_interactive():
+    value = input()
+    if value == "Вакансии":
+        import statistic
+        statistic.execute()
+    elif value == "Статистика":
+        import diagrams
+        diagrams.execute()
+    else:
+        print("Некорректный ввод")
+
+
+def run_vacancies(args):
+    from api import load_dataset
+    from instrumentation import tracer
+    dataset = load_dataset(args.file_name, rates_name=args.rates)
+    vacancy_table = dataset.get_table(args.filter, args.sort, "Да" if args.reverse else "Нет", args.range, args.columns)
+    with tracer.stage('render'):
+        print(vacancy_table)
+
+
+def run_approximate(args):
+    import approximate
+    import diagrams
+    from currency import get_currency_rates
+    start = time.perf_counter()
+    if args.sample is not None:
+        statistics = approximate.read_sample(args.sample, args.professions[0], get_currency_rates(args.rates),
+                                             args.confidence)
+    else:
+        statistics = approximate.sample_file(args.file_name, args.professions[0], get_currency_rates(args.rates),
+                                             args.approximate, args.seed, args.confidence)
+    timings = {'statistics': time.perf_counter() - start}
+    approximate.print_statistics(statistics)
+    if args.artifacts:
+        os.makedirs(args.output_dir, exist_ok=True)
+        timings.update(diagrams.Report(diagrams.ReportModel.from_statistics(statistics), args.output_dir,
+                                       args.pdf_backend).generate(args.artifacts))
+    return timings
+
+
+def run_statistics(args):
+    import diagrams
+    if args.approximate is not None or args.sample is not None:
+        timings = run_approximate(args)
+    elif len(args.professions) == 1 and not args.combined:
+        timings = diagrams.execute(args.workers, not args.no_cache, args.backend, args.store, args.artifacts,
+                                   args.file_name, args.professions[0], args.output_dir, args.pdf_backend, args.rates)
+    else:
+        timings = diagrams.execute_batch(args.file_name, args.professions, args.output_dir, args.combined,
+                                         args.workers, not args.no_cache, args.backend, args.artifacts,
+                                         args.pdf_backend, args.rates)
+    if args.timings:
+        for name, elapsed in timings.items():
+            print(f"{name}: {elapsed:.3f} с")
+
+
+def run(args):
+    if args.mode is None:
+        run_interactive()
+    elif args.mode == 'vacancies':
+        run_vacancies(args)
+    elif args.mode == 'sample':
+        import approximate
+        approximate.write_sample(args.file_name, args.sample_name, args.size, args.seed)
+    else:
+        run_statistics(args)
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    check_arguments(parser, args)
+    if args.trace is None and args.profile is None:
+        run(args)
+        return
+    from instrumentation import tracer
+    tracer.enable(args.trace_memory, args.profile is not None)
+    try:
+        run(args)
+    finally:
+        tracer.dump(args.trace, args.profile)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
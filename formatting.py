@@ -0,0 +1,59 @@
+import re
+
+CURRENCY_NAMES = dict(zip(['AZN', 'BYR', 'EUR', 'GEL', 'KGS', 'KZT', 'RUR', 'UAH', 'USD', 'UZS'],
+                          ["Манаты", "Белорусские рубли", "Евро", "Грузинский лари", "Киргизский сом", "Тенге",
+                           "Рубли", "Гривны", "Доллары", "Узбекский сум"]))
+EXPERIENCE_NAMES = dict(zip(["noExperience", "between1And3", "between3And6", "moreThan6"],
+                            ["Нет опыта", "От 1 года до 3 лет", "От 3 до 6 лет", "Более 6 лет"]))
+TAX_NAMES = {"True": "Без вычета налогов"}
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def convert_bool(value):
+    return "Да" if value == "True" else "Нет"
+
+
+def convert_bool_reverse(value):
+    return True if value == "Да" else False
+
+
+def fix_salary(salary):
+    integer, point, fraction = str(salary).partition('.')
+    return (integer[:-3] + ' ' + integer[-3:]).lstrip() + point + fraction
+
+
+def fix_field(field):
+    if '<' in field:
+        field = TAG_PATTERN.sub('', field)
+    return ' '.join(field.split())
+
+
+def get_date(datetime):
+    return ".".join(reversed(datetime[:datetime.index('T')].split('-')))
+
+
+def line_trim(value):
+    return value[:100] + '...' if len(value) > 100 else value
+
+
+def get_salary_string(salary):
+    return f"{fix_salary(salary.salary_from)} - {fix_salary(salary.salary_to)} " \
+           f"({CURRENCY_NAMES[salary.salary_currency]}) ({TAX_NAMES.get(salary.salary_gross, 'С вычетом налогов')})"
+
+
+FIELD_FORMATTERS = {
+    "Название": lambda vacancy: fix_field(vacancy.name),
+    "Описание": lambda vacancy: fix_field(vacancy.description),
+    "Навыки": lambda vacancy: "\n".join(vacancy.key_skills),
+    "Опыт работы": lambda vacancy: EXPERIENCE_NAMES[vacancy.experience_id],
+    "Премиум-вакансия": lambda vacancy: convert_bool(vacancy.premium),
+    "Компания": lambda vacancy: vacancy.employer_name,
+    "Оклад": lambda vacancy: get_salary_string(vacancy.salary),
+    "Название региона": lambda vacancy: vacancy.area_name,
+    "Дата публикации вакансии": lambda vacancy: get_date(vacancy.published_at),
+}
+
+
+def format_all(vacancies, fields):
+    columns = [[line_trim(value) for value in map(FIELD_FORMATTERS[field], vacancies)] for field in fields]
+    return [list(row) for row in zip(*columns)]
@@ -0,0 +1,97 @@
+import csv
+import hashlib
+import json
+import os
+from aggregation import Statistics, aggregate_rows, read_lines
+
+STORE_VERSION = 1
+DIGEST_SIZE = 1 << 16
+
+
+def find_complete_end(file_name, start):
+    end = start
+    quotes = 0
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        for line in iter(file.readline, b''):
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                end = file.tell()
+    return end
+
+
+def get_digest(file_name, offset):
+    with open(file_name, 'rb') as file:
+        start = max(offset - DIGEST_SIZE, 0)
+        file.seek(start)
+        return hashlib.blake2b(file.read(offset - start), digest_size=16).hexdigest()
+
+
+def is_appended(file_name, state, header):
+    if state['header'] != header or state['offset'] > os.path.getsize(file_name):
+        return False
+    if state.get('digest') != get_digest(file_name, state['offset']):
+        return False
+    with open(file_name, 'rb') as file:
+        file.seek(max(state['offset'] - 1, 0))
+        last, following = file.read(1), file.read(1)
+    return last == b'\n' or following in [b'', b'\r', b'\n']
+
+
+def read_header(file_name):
+    with open(file_name, 'rb') as file:
+        line = file.readline()
+        return next(csv.reader([line.decode('utf-8-sig')]), []), len(line)
+
+
+class StatisticsStore:
+    def __init__(self, store_name, profession_keys, profession_name, currency_rates):
+        self.store_name = store_name
+        self.profession_keys = profession_keys
+        self.currency_rates = currency_rates
+        self.statistics = Statistics(profession_name, currency_rates)
+        self.files = dict()
+        if os.path.exists(store_name):
+            self.load()
+        if self.statistics.profession_name != profession_name:
+            raise ValueError(f"Хранилище {store_name} собрано для профессии «{self.statistics.profession_name}»")
+
+    def load(self):
+        with open(self.store_name, encoding='utf-8') as file:
+            data = json.load(file)
+        if data['version'] != STORE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища {self.store_name}")
+        if data.get('rates') != self.currency_rates.get_signature():
+            raise ValueError(f"Курсы валют изменились после сборки хранилища {self.store_name}, "
+                             f"нужен полный пересчёт")
+        self.files = data['files']
+        self.statistics = Statistics.from_dict(data['statistics'], self.currency_rates)
+
+    def save(self):
+        temp_name = self.store_name + '.tmp'
+        with open(temp_name, 'w', encoding='utf-8') as file:
+            json.dump({'version': STORE_VERSION, 'rates': self.currency_rates.get_signature(), 'files': self.files,
+                       'statistics': self.statistics.to_dict()}, file, ensure_ascii=False)
+        os.replace(temp_name, self.store_name)
+
+    def update(self, file_name):
+        key = os.path.abspath(file_name)
+        header, start = read_header(file_name)
+        if key in self.files:
+            if not is_appended(file_name, self.files[key], header):
+                raise ValueError(f"Файл {file_name} изменился не только дописыванием, нужен полный пересчёт")
+            start = self.files[key]['offset']
+        end = find_complete_end(file_name, start)
+        if end > start:
+            self.statistics.merge(aggregate_rows(csv.reader(read_lines(file_name, start, end)), header,
+                                                 self.profession_keys, Statistics(self.statistics.profession_name,
+                                                                                  self.currency_rates)))
+        self.files[key] = {'header': header, 'offset': end, 'digest': get_digest(file_name, end)}
+        return end - start
+
+
+def update_store(store_name, file_names, profession_keys, profession_name, currency_rates):
+    store = StatisticsStore(store_name, profession_keys, profession_name, currency_rates)
+    if sum([store.update(file_name) for file_name in file_names]) > 0:
+        store.save()
+    return store.statistics
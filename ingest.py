@@ -0,0 +1,86 @@
+import math
+from operator import itemgetter
+
+BUFFER_SIZE = 1 << 20
+
+
+def open_csv(file_name, newline=''):
+    return open(file_name, encoding='utf-8-sig', newline=newline, buffering=BUFFER_SIZE)
+
+
+def parse_salary(value):
+    salary = float(value)
+    return int(salary) if salary.is_integer() else salary
+
+
+def get_salary(salary_from, salary_to):
+    return int((salary_from + salary_to) // 2)
+
+
+def is_number(value):
+    try:
+        return math.isfinite(float(value))
+    except ValueError:
+        return False
+
+
+def is_date(value):
+    return len(value) >= 11 and value[4] + value[7] + value[10] == '--T' and \
+        (value[:4] + value[5:7] + value[8:10]).isdecimal()
+
+
+def get_validators(currencies):
+    return {'salary_from': is_number, 'salary_to': is_number, 'salary_currency': currencies.__contains__,
+            'published_at': is_date}
+
+
+def get_invalid_reason(values, columns, validators):
+    for column, value in zip(columns, values):
+        if column in validators and not validators[column](value):
+            return f'invalid:{column}'
+    return 'invalid:row'
+
+
+def get_reject_reason(row, header, indexes):
+    if len(row) < len(header):
+        return 'short_row'
+    for index in indexes:
+        if not row[index]:
+            return f'empty:{header[index]}'
+    return None
+
+
+def add_rejected(rejected, reason, count=1):
+    rejected[reason] = rejected.get(reason, 0) + count
+
+
+def read_rows(rows, header, columns, rejected):
+    indexes = [header.index(column) for column in columns]
+    get_values = itemgetter(*indexes) if len(indexes) > 1 else lambda row: (row[indexes[0]],)
+    width = len(header)
+    for row in rows:
+        if len(row) >= width:
+            values = get_values(row)
+            if all(values):
+                yield values
+                continue
+        if len(row) != 0:
+            add_rejected(rejected, get_reject_reason(row, header, indexes))
+
+
+def read_full_rows(rows, header, columns, rejected, validators=None):
+    indexes = [header.index(column) for column in columns]
+    get_values = itemgetter(*indexes) if len(indexes) > 1 else lambda row: (row[indexes[0]],)
+    checks = [(index, validators[column]) for index, column in zip(indexes, columns)
+              if validators is not None and column in validators]
+    width = len(header)
+    for row in rows:
+        if len(row) >= width and all(get_values(row)):
+            for index, validator in checks:
+                if not validator(row[index]):
+                    add_rejected(rejected, f'invalid:{header[index]}')
+                    break
+            else:
+                yield row
+        elif len(row) != 0:
+            add_rejected(rejected, get_reject_reason(row, header, indexes))
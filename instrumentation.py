@@ -0,0 +1,67 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+NULL_STAGE = nullcontext()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.profiler = None
+        self.start = None
+        self.stages = []
+        self.counters = dict()
+
+    def enable(self, memory=False, profile=False):
+        self.enabled = True
+        self.memory = memory
+        self.start = time.perf_counter()
+        if memory:
+            tracemalloc.start()
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        return self.measure(name)
+
+    @contextmanager
+    def measure(self, name):
+        if self.memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = {'name': name, 'seconds': time.perf_counter() - start}
+            if self.memory:
+                stage['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            self.stages.append(stage)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {'total_seconds': time.perf_counter() - self.start, 'stages': self.stages, 'counters': self.counters}
+
+    def dump(self, trace_name=None, profile_name=None):
+        if self.profiler is not None:
+            self.profiler.disable()
+            if profile_name is not None:
+                self.profiler.dump_stats(profile_name)
+        if trace_name is not None:
+            with open(trace_name, 'w', encoding='utf-8') as file:
+                json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+        if self.memory:
+            tracemalloc.stop()
+        self.enabled = False
+
+
+tracer = Tracer()
@@ -0,0 +1,130 @@
+import heapq
+from itertools import chain, islice
+from currency import get_currency_rates
+from formatting import CURRENCY_NAMES, EXPERIENCE_NAMES, FIELD_FORMATTERS
+from instrumentation import tracer
+
+
+class IntervalNode:
+    def __init__(self, intervals):
+        points = sorted(point for start, end, _ in intervals for point in (start, end))
+        self.center = points[len(points) // 2]
+        left = [interval for interval in intervals if interval[1] < self.center]
+        right = [interval for interval in intervals if interval[0] > self.center]
+        middle = [interval for interval in intervals if interval[0] <= self.center <= interval[1]]
+        self.by_start = sorted(middle, key=lambda interval: interval[0])
+        self.by_end = sorted(middle, key=lambda interval: interval[1], reverse=True)
+        self.left = IntervalNode(left) if left and len(left) < len(intervals) else None
+        self.right = IntervalNode(right) if right and len(right) < len(intervals) else None
+
+    def stab(self, point, result):
+        node = self
+        while node is not None:
+            if point < node.center:
+                for start, _, index in node.by_start:
+                    if start > point:
+                        break
+                    result.append(index)
+                node = node.left
+            else:
+                for _, end, index in node.by_end:
+                    if end < point:
+                        break
+                    result.append(index)
+                node = node.right if point > node.center else None
+        return result
+
+
+VALUE_GETTERS = {
+    **FIELD_FORMATTERS,
+    "Идентификатор валюты оклада": lambda vacancy: CURRENCY_NAMES[vacancy.salary.salary_currency],
+}
+
+
+class VacancyQuery:
+    def __init__(self, vacancies, currency_rates=None):
+        self.vacancies = vacancies
+        self.currency_rates = currency_rates if currency_rates is not None else get_currency_rates()
+        self.values = dict()
+        self.indexes = dict()
+        self.skills = None
+        self.salaries = None
+        self.sort_keys = {
+            "Навыки": lambda index: len(self.vacancies[index].key_skills),
+            "Оклад": lambda index: self.vacancies[index].salary.converter(self.vacancies[index].published_at,
+                                                                          self.currency_rates),
+            "Опыт работы": lambda index: EXPERIENCE_NAMES[self.vacancies[index].experience_id][3],
+            "Дата публикации вакансии": lambda index: self.vacancies[index].published_at,
+        }
+
+    def get_values(self, tag):
+        if tag not in self.values:
+            self.values[tag] = list(map(VALUE_GETTERS[tag], self.vacancies))
+        return self.values[tag]
+
+    def get_index(self, tag):
+        if tag not in self.indexes:
+            self.indexes[tag] = self.build_index(self.get_values(tag))
+        return self.indexes[tag]
+
+    def get_skills(self):
+        if self.skills is None:
+            self.skills = self.build_index([vacancy.key_skills for vacancy in self.vacancies], multiple=True)
+        return self.skills
+
+    def get_salaries(self):
+        if self.salaries is None:
+            intervals = [(vacancy.salary.salary_from, vacancy.salary.salary_to, index)
+                         for index, vacancy in enumerate(self.vacancies)
+                         if vacancy.salary.salary_from <= vacancy.salary.salary_to]
+            self.salaries = IntervalNode(intervals) if intervals else False
+        return self.salaries
+
+    @staticmethod
+    def build_index(values, multiple=False):
+        index = dict()
+        for position, value in enumerate(values):
+            for key in dict.fromkeys(value) if multiple else [value]:
+                index.setdefault(key, []).append(position)
+        return index
+
+    def filter(self, filter_string):
+        if filter_string == "":
+            return iter(range(len(self.vacancies)))
+        key, value = filter_string.split(": ")[:2]
+        if key == "Навыки":
+            skills = self.get_skills()
+            postings = sorted((skills.get(skill, []) for skill in set(value.split(", "))), key=len)
+            others = [set(posting) for posting in postings[1:]]
+            return (index for index in postings[0] if all(index in other for other in others))
+        if key == "Оклад":
+            salaries = self.get_salaries()
+            return iter(sorted(salaries.stab(int(value), [])) if salaries else [])
+        if key in VALUE_GETTERS:
+            return iter(self.get_index(key).get(value, []))
+        return iter([])
+
+    def get_sort_key(self, sort_string):
+        if sort_string in self.sort_keys:
+            return self.sort_keys[sort_string]
+        return self.get_values(sort_string).__getitem__
+
+    def sort(self, indexes, sort_string, reverse, limit=None):
+        if sort_string == "":
+            return indexes
+        key = self.get_sort_key(sort_string)
+        if limit is None:
+            return iter(sorted(indexes, key=key, reverse=reverse))
+        return iter(heapq.nlargest(limit, indexes, key=key) if reverse else heapq.nsmallest(limit, indexes, key=key))
+
+    def execute(self, filter_string, sort_string, reverse, start=0, end=None):
+        indexes = self.filter(filter_string)
+        if tracer.enabled:
+            indexes = list(indexes)
+            tracer.count('rows_matched', len(indexes))
+            indexes = iter(indexes)
+        first = next(indexes, None)
+        if first is None:
+            return False, []
+        page = islice(self.sort(chain([first], indexes), sort_string, reverse, end), start, end)
+        return True, [(number + 1, self.vacancies[index]) for number, index in enumerate(page, start)]
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+from api import load_dataset
+from cache import load_table
+from incremental import read_header
+from statistic import check_numbers, check_parameters, get_vacancy_rows
+
+VACANCY_COLUMNS = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from',
+                   'salary_to', 'salary_gross', 'salary_currency', 'area_name', 'published_at']
+STATUS_NAMES = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                500: 'Internal Server Error'}
+dataset = None
+
+
+def init_worker(file_name, use_cache, backend, rates_name):
+    global dataset
+    dataset = load_dataset(file_name, use_cache, backend=backend, rates_name=rates_name)
+
+
+def warm_up():
+    if all(key in read_header(dataset.file_name)[0] for key in VACANCY_COLUMNS):
+        dataset.get_query()
+    dataset.get_statistics([])
+    return os.getpid()
+
+
+def get_param(params, name):
+    return params.get(name, [''])[0]
+
+
+def query_vacancies(params):
+    filter_string, sort_string = get_param(params, 'filter'), get_param(params, 'sort')
+    reverse_sort = get_param(params, 'reverse')
+    message = check_parameters(filter_string, sort_string, reverse_sort) or check_numbers(get_param(params, 'range'))
+    if message is not None:
+        return 400, {'error': message}
+    vacancy_query = dataset.get_query()
+    if not vacancy_query.vacancies:
+        return 200, {'message': "Нет данных", 'rows': []}
+    is_found, fields, rows = get_vacancy_rows(vacancy_query, filter_string, sort_string, reverse_sort,
+                                              get_param(params, 'range'), get_param(params, 'columns'))
+    if not is_found:
+        return 200, {'message': "Ничего не найдено", 'rows': []}
+    return 200, {'rows': [dict(zip(["№"] + fields, row)) for row in rows]}
+
+
+def query_years(params):
+    statistics = dataset.get_statistics([])
+    salary_dict, count_dict = statistics.get_year_info(statistics.years)
+    return 200, {'salary': salary_dict, 'count': count_dict}
+
+
+def query_cities(params):
+    ans_dict, percent_dict = dataset.get_statistics([]).get_city_info()
+    return 200, {'salary': ans_dict, 'fraction': percent_dict}
+
+
+def query_professions(params):
+    names = params.get('name', [])
+    if not names:
+        return 400, {'error': "Не задано ни одной профессии"}
+    statistics = dataset.get_statistics(names)
+    professions = dict()
+    for index, name in enumerate(statistics.profession_names):
+        salary_dict, count_dict = statistics.get_year_info(statistics.get_profession_years(index))
+        professions[name] = {'salary': salary_dict, 'count': count_dict}
+    return 200, professions
+
+
+ROUTES = {'/vacancies': query_vacancies, '/years': query_years, '/cities': query_cities,
+          '/professions': query_professions}
+
+
+def run_route(path, params):
+    status, data = ROUTES[path](params)
+    return status, json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class ResultCache:
+    def __init__(self, size):
+        self.size = size
+        self.results = OrderedDict()
+
+    async def get(self, key, function):
+        future = self.results.get(key)
+        if future is None:
+            future = asyncio.ensure_future(function())
+            self.results[key] = future
+            if len(self.results) > self.size:
+                self.results.popitem(last=False)
+        else:
+            self.results.move_to_end(key)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self.results.get(key) is future:
+                del self.results[key]
+            raise
+
+
+class QueryServer:
+    def __init__(self, file_name, workers=2, cache_size=256, use_cache=True, backend='auto', rates_name=None):
+        self.file_name = file_name
+        self.rates_name = rates_name
+        self.workers = workers
+        self.use_cache = use_cache
+        self.backend = backend
+        self.cache = ResultCache(cache_size)
+        self.pool = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        if self.use_cache:
+            load_table(self.file_name)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                        initargs=(self.file_name, self.use_cache, self.backend, self.rates_name))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, warm_up) for _ in range(self.workers)])
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    async def get_response(self, method, target):
+        url = urlsplit(target)
+        if url.path not in ROUTES:
+            return 404, json.dumps({'error': "Неизвестный адрес"}, ensure_ascii=False).encode('utf-8')
+        if method != 'GET':
+            return 405, json.dumps({'error': "Поддерживается только GET"}, ensure_ascii=False).encode('utf-8')
+        params = parse_qs(url.query, keep_blank_values=True)
+        key = (url.path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        loop = asyncio.get_running_loop()
+        return await self.cache.get(key, lambda: loop.run_in_executor(self.pool, run_route, url.path, params))
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in [b'\r\n', b'\n', b'']:
+                pass
+            if len(request_line) < 2:
+                return
+            try:
+                status, body = await self.get_response(request_line[0], request_line[1])
+            except Exception as error:
+                status, body = 500, json.dumps({'error': str(error)}, ensure_ascii=False).encode('utf-8')
+            writer.write(f"HTTP/1.1 {status} {STATUS_NAMES[status]}\r\n"
+                         f"Content-Type: application/json; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(file_name, host='127.0.0.1', port=8000, workers=2, cache_size=256, use_cache=True, backend='auto',
+                rates_name=None):
+    query_server = QueryServer(file_name, workers, cache_size, use_cache, backend, rates_name)
+    server = await query_server.start(host, port)
+    print(f"Сервер запущен на http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        query_server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTTP-сервис запросов к вакансиям")
+    parser.add_argument('file_name', help="CSV-файл с вакансиями")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=2, help="Число процессов для обработки запросов")
+    parser.add_argument('--cache-size', type=int, default=256, help="Число запросов в кэше результатов")
+    parser.add_argument('--no-cache', action='store_true', help="Не использовать колоночный кэш")
+    parser.add_argument('--backend', choices=['auto', 'python', 'numpy'], default='auto')
+    parser.add_argument('--rates', help="CSV- или JSON-файл курсов валют (по умолчанию currency_rates.csv)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.file_name, args.host, args.port, args.workers, args.cache_size, not args.no_cache,
+                      args.backend, args.rates))
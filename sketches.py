@@ -0,0 +1,92 @@
+import base64
+import hashlib
+import math
+
+
+class TDigest:
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.centroids = []
+        self.buffer = []
+
+    def add(self, value, weight=1):
+        self.buffer.append([value, weight])
+        if len(self.buffer) >= self.compression * 5:
+            self.compress()
+
+    def merge(self, other):
+        self.buffer.extend([mean, weight] for mean, weight in other.centroids + other.buffer)
+        self.compress()
+
+    def get_scale(self, quantile):
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(quantile, 0), 1) - 1)
+
+    def compress(self):
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+        total = sum(weight for _, weight in points)
+        centroids = []
+        so_far = 0
+        limit = self.get_scale(0) + 1
+        for mean, weight in points:
+            if centroids and self.get_scale((so_far + weight) / total) <= limit:
+                centroid = centroids[-1]
+                centroid[1] += weight
+                centroid[0] += (mean - centroid[0]) * weight / centroid[1]
+            else:
+                limit = self.get_scale(so_far / total) + 1
+                centroids.append([mean, weight])
+            so_far += weight
+        self.centroids = centroids
+
+    def quantile(self, quantile):
+        if self.buffer:
+            self.compress()
+        if not self.centroids:
+            return None
+        target = quantile * sum(weight for _, weight in self.centroids)
+        so_far = 0
+        for index, (mean, weight) in enumerate(self.centroids):
+            if so_far + weight / 2 >= target:
+                if index == 0:
+                    return mean
+                previous_mean, previous_weight = self.centroids[index - 1]
+                previous_center = so_far - previous_weight / 2
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / \
+                    (so_far + weight / 2 - previous_center)
+            so_far += weight
+        return self.centroids[-1][0]
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        hash_value = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hash_value >> (64 - self.precision)
+        rank = 64 - self.precision - (hash_value & ((1 << (64 - self.precision)) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def to_string(self):
+        return base64.b64encode(self.registers).decode('ascii')
+
+    @staticmethod
+    def from_string(data):
+        registers = base64.b64decode(data)
+        sketch = HyperLogLog(len(registers).bit_length() - 1)
+        sketch.registers = bytearray(registers)
+        return sketch
@@ -1,109 +1,95 @@
 from prettytable import PrettyTable
 import csv
-import re
 import os
+import sys
+from cache import load_table
+from currency import get_currency_rates
+from formatting import CURRENCY_NAMES, EXPERIENCE_NAMES, convert_bool_reverse, format_all
+from ingest import get_validators, open_csv, parse_salary, read_full_rows
+from instrumentation import tracer
+from query import VacancyQuery
 
-
-def convert_bool(value):
-    return "Да" if value == "True" else "Нет"
-
-
-def convert_bool_reverse(value):
-    return True if value == "Да" else False
-
-
-def convert_tax(bool_value):
-    return "С вычетом налогов" if bool_value.lower() != "да" else "Без вычета налогов"
-
-
-def fix_salary(salary):
-    return (salary.replace('.0', '')[:-3] + ' ' + salary.replace('.0', '')[-3:]).lstrip()
-
-
-def fix_field(field):
-    return ' '.join(re.sub(re.compile(r'<[^>]+>'), '', field).split())
-
-
-def get_date(datetime):
-    return ".".join(reversed(datetime[:datetime.index('T')].split('-')))
-
-
-def line_trim(vacancy, attr):
-    return getattr(vacancy, attr)[:100] + '...' if len(getattr(vacancy, attr)) > 100 else getattr(vacancy, attr)[:100]
+FILTER_KEYS = ["Название", "Описание", "Навыки", "Опыт работы", "Премиум-вакансия", "Компания", "Оклад",
+               "Название региона", "Дата публикации вакансии", "Идентификатор валюты оклада", ]
+TABLE_TAGS = ["Название", "Описание", "Навыки", "Опыт работы", "Премиум-вакансия", "Компания", "Оклад",
+              "Название региона", "Дата публикации вакансии"]
 
 
 class DataSet:
-    def __init__(self, file_name):
+    def __init__(self, file_name, use_cache=True):
         self.file_name = file_name
+        self.use_cache = use_cache
         self.salary_keys = ['salary_from', 'salary_to', 'salary_gross', 'salary_currency']
         self.vacancy_keys = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name',
                              object, 'area_name', 'published_at']
 
-    def csv_reader(self):
-        with open(self.file_name, encoding='utf-8-sig') as file:
-            return [row for row in csv.DictReader(file)]
+    def get_columns(self):
+        return self.salary_keys + [key for key in self.vacancy_keys if key != object]
+
+    def get_validators(self):
+        return {**get_validators(CURRENCY_NAMES), 'experience_id': EXPERIENCE_NAMES.__contains__}
+
+    def read_file_rows(self, rejected):
+        with open_csv(self.file_name) as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            yield header
+            yield from read_full_rows(reader, header, self.get_columns(), rejected, self.get_validators())
+
+    def read_rows(self, rejected):
+        table = load_table(self.file_name) if self.use_cache else None
+        if table is None:
+            rows = self.read_file_rows(rejected)
+            return next(rows), rows
+        return table.header, table.get_rows(table.get_valid(self.get_columns(), rejected, self.get_validators()))
 
     def csv_filer(self):
+        rejected = dict()
+        header, rows = self.read_rows(rejected)
+        salary_indexes = [header.index(key) for key in self.salary_keys]
+        vacancy_indexes = [header.index(key) if key != object else key for key in self.vacancy_keys]
         vacancies_objects = list()
-        for row in DataSet.csv_reader(self):
-            correct_row = True
-            for field in row:
-                if row[field] is None or len(row[field]) == 0:
-                    correct_row = False
-                    continue
-            if correct_row:
-                salary = Salary(*[row[key] for key in self.salary_keys])
-                vacancy = Vacancy(*[row[key] if key != object else salary for key in self.vacancy_keys])
-                vacancies_objects.append(vacancy)
+        for row in rows:
+            salary = Salary(*[row[index] for index in salary_indexes])
+            vacancy = Vacancy(*[row[index] if index != object else salary for index in vacancy_indexes])
+            vacancies_objects.append(vacancy)
+        if tracer.enabled:
+            tracer.count('rows_read', len(vacancies_objects) + sum(rejected.values()))
+            tracer.count('rows_rejected', sum(rejected.values()))
+            for reason, count in rejected.items():
+                tracer.count(f'rejected:{reason}', count)
         return vacancies_objects if len(vacancies_objects) != 0 else False
 
 
 class Vacancy:
+    __slots__ = ('name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary',
+                 'area_name', 'published_at')
+
     def __init__(self, name, description, key_skills, experience_id, premium,
                  employer_name, salary, area_name, published_at):
         self.name = name
         self.description = description
-        self.key_skills = key_skills.split('\n')
-        self.experience_id = experience_id
-        self.premium = premium
-        self.employer_name = employer_name
+        self.key_skills = tuple(sys.intern(skill) for skill in key_skills.split('\n'))
+        self.experience_id = sys.intern(experience_id)
+        self.premium = sys.intern(premium)
+        self.employer_name = sys.intern(employer_name)
         self.salary = salary
-        self.area_name = area_name
+        self.area_name = sys.intern(area_name)
         self.published_at = published_at
 
-    def formatter(self):
-        currency_key_eng = ['AZN', 'BYR', 'EUR', 'GEL', 'KGS', 'KZT', 'RUR', 'UAH', 'USD', 'UZS']
-        currency_key_rus = ["Манаты", "Белорусские рубли", "Евро", "Грузинский лари", "Киргизский сом", "Тенге",
-                            "Рубли", "Гривны", "Доллары", "Узбекский сум"]
-
-        experience_key_eng = ["noExperience", "between1And3", "between3And6", "moreThan6"]
-        experience_key_rus = ["Нет опыта", "От 1 года до 3 лет", "От 3 до 6 лет", "Более 6 лет"]
-
-        currency_dict = dict(zip(currency_key_eng, currency_key_rus))
-        experience_dict = dict(zip(experience_key_eng, experience_key_rus))
-
-        self.salary.salary_currency = currency_dict[self.salary.salary_currency]
-        self.experience_id = experience_dict[self.experience_id]
-        self.description = fix_field(self.description)
-        self.name = fix_field(self.name)
-        self.premium = convert_bool(self.premium)
-        self.salary.salary_gross = convert_bool(self.salary.salary_gross)
-
 
 class Salary:
+    __slots__ = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency')
+
     def __init__(self, salary_from, salary_to, salary_gross, salary_currency):
-        self.salary_from = salary_from
-        self.salary_to = salary_to
-        self.salary_gross = salary_gross
-        self.salary_currency = salary_currency
+        self.salary_from = parse_salary(salary_from)
+        self.salary_to = parse_salary(salary_to)
+        self.salary_gross = sys.intern(salary_gross)
+        self.salary_currency = sys.intern(salary_currency)
 
-    def converter(self, salary_currency):
-        currency_key = ["Манаты", "Белорусские рубли", "Евро", "Грузинский лари", "Киргизский сом", "Тенге", "Рубли",
-                        "Гривны", "Доллары", "Узбекский сум"]
-        currency_value = [35.68, 23.91, 59.00, 21.74, 0.76, 0.13, 1, 1.64, 60.66, 0.0055]
-        currency_dict = dict(zip(currency_key, currency_value))
-        return (int(self.salary_to.replace('.0', '')) + int(self.salary_from.replace('.0', ''))) // 2 \
-               * currency_dict[salary_currency]
+    def converter(self, published_at, currency_rates=None):
+        currency_rates = currency_rates if currency_rates is not None else get_currency_rates()
+        return (self.salary_to + self.salary_from) // 2 * currency_rates.get_rate(self.salary_currency, published_at)
 
 
 class InputConect:
@@ -116,114 +102,78 @@ class InputConect:
         self.skills = input("Введите требуемые столбцы: ")
         self.is_correct_parameters = False
         self.data_vacancies = []
-        self.keys = ["Название", "Описание", "Навыки", "Опыт работы", "Премиум-вакансия", "Компания",
-                     "Оклад", "Название региона", "Дата публикации вакансии", "Идентификатор валюты оклада", ]
+        self.keys = FILTER_KEYS
 
     def process_data(self):
-        if os.stat(self.file_name).st_size == 0:
-            print("Пустой файл")
-        elif ':' not in self.filter_string and self.filter_string != "":
-            print("Формат ввода некорректен")
-        elif self.filter_string.split(": ")[0] not in self.keys and self.filter_string.split(": ")[0] != "":
-            print("Параметр поиска некорректен")
-        elif self.sort_string not in self.keys and self.sort_string != "":
-            print("Параметр сортировки некорректен")
-        elif self.reverse_sort not in ["Да", "Нет", ""]:
-            print("Порядок сортировки задан некорректно")
+        message = "Пустой файл" if os.stat(self.file_name).st_size == 0 \
+            else check_parameters(self.filter_string, self.sort_string, self.reverse_sort) or \
+            check_numbers(self.numbers)
+        if message is not None:
+            print(message)
         else:
             self.is_correct_parameters = True
-            self.data_vacancies = DataSet(self.file_name).csv_filer()
+            with tracer.stage('load'):
+                self.data_vacancies = DataSet(self.file_name).csv_filer()
 
     def print_vacancies(self):
-        usual_tags = ["Дата публикации вакансии", "Опыт работы", "Премиум-вакансия", "Название региона",
-                      "Компания", "Название", "Описание"]
-        tags = ["Название", "Описание", "Навыки", "Опыт работы", "Премиум-вакансия", "Компания", "Оклад",
-                "Название региона", "Дата публикации вакансии"]
-        translate_tags = ["name", "description", "key_skills", "experience_id", "premium", "employer_name",
-                          "salary_all", "area_name", "published_at"]
-        translate_dict = dict(zip(tags, translate_tags))
-
-        vacancy_table = PrettyTable()
-        vacancy_table.hrules = 1
-        vacancy_table.align = "l"
-        vacancy_table.field_names = ["№"] + tags
-        vacancy_table._max_width = {field: 20 for field in vacancy_table.field_names}
-
-        filter_string = self.filter_string.split(": ")
-        numbers_none = len(self.numbers) == 0
-        skills_none = len(self.skills) == 0
-
-        if not self.data_vacancies:
-            print("Нет данных")
-            return
-        else:
-            [vacancy.formatter() for vacancy in self.data_vacancies]
-            if self.sort_string == "":
-                pass
-            elif self.sort_string == "Навыки":
-                self.data_vacancies.sort(key=lambda vacancy: len(vacancy.key_skills),
-                                         reverse=convert_bool_reverse(self.reverse_sort))
-            elif self.sort_string == "Оклад":
-                self.data_vacancies.sort(key=lambda vacancy: vacancy.salary.converter(vacancy.salary.salary_currency),
-                                         reverse=convert_bool_reverse(self.reverse_sort))
-            elif self.sort_string == "Опыт работы":
-                self.data_vacancies.sort(key=lambda vacancy: vacancy.experience_id[3],
-                                         reverse=convert_bool_reverse(self.reverse_sort))
-            else:
-                self.data_vacancies.sort(key=lambda vacancy: getattr(vacancy, translate_dict[self.sort_string]),
-                                         reverse=convert_bool_reverse(self.reverse_sort))
-
-            new_data_vacancies = []
-            for vacancy in self.data_vacancies:
-                vacancy.published_at = get_date(vacancy.published_at)
-                vacancy.key_skills = "\n".join(vacancy.key_skills)
-                if filter_string[0] == "" or (filter_string[0] in usual_tags and
-                                              filter_string[1] == getattr(vacancy, translate_dict[filter_string[0]])):
-                    new_data_vacancies.append(vacancy)
-                else:
-                    if filter_string[0] == "Навыки":
-                        if set(filter_string[1].split(", ")).issubset(getattr(vacancy, translate_dict[filter_string[0]])
-                                                                              .split("\n")):
-                            new_data_vacancies.append(vacancy)
-                    elif filter_string[0] == "Оклад":
-                        if int(vacancy.salary.salary_from) <= int(filter_string[1]) <= int(vacancy.salary.salary_to):
-                            new_data_vacancies.append(vacancy)
-                    elif filter_string[0] == "Идентификатор валюты оклада":
-                        if vacancy.salary.salary_currency == filter_string[1]:
-                            new_data_vacancies.append(vacancy)
-
-            for vacancy in new_data_vacancies:
-                vacancy.salary = f"{fix_salary(vacancy.salary.salary_from)} - " \
-                                 f"{fix_salary(vacancy.salary.salary_to)}" \
-                                 f" ({vacancy.salary.salary_currency}) ({convert_tax(vacancy.salary.salary_gross)})"
-                vacancy_table.add_row([new_data_vacancies.index(vacancy) + 1] +
-                                      [line_trim(vacancy, attr) for attr in vars(vacancy).keys()])
-
-        if not numbers_none and not skills_none:
-            numbers = self.numbers.split()
-            if len(numbers) == 1:
-                vacancy_table = vacancy_table.get_string(start=int(numbers[0]) - 1,
-                                                         fields=['№'] + self.skills.split(', '))
-            else:
-                vacancy_table = vacancy_table.get_string(start=int(numbers[0]) - 1, end=int(numbers[1]) - 1,
-                                                         fields=['№'] + self.skills.split(', '))
-
-        if not numbers_none and skills_none:
-            numbers = self.numbers.split()
-            if len(numbers) == 1:
-                vacancy_table = vacancy_table.get_string(start=int(numbers[0]) - 1)
-            else:
-                vacancy_table = vacancy_table.get_string(start=int(numbers[0]) - 1, end=int(numbers[1]) - 1)
-
-        if numbers_none and not skills_none:
-            vacancy_table = vacancy_table.get_string(fields=['№'] + self.skills.split(', '))
-
-        if len(new_data_vacancies) == 0:
-            print("Ничего не найдено")
-        else:
+        with tracer.stage('index'):
+            vacancy_query = VacancyQuery(self.data_vacancies) if self.data_vacancies else None
+        vacancy_table = get_vacancy_table(vacancy_query, self.filter_string, self.sort_string, self.reverse_sort,
+                                          self.numbers, self.skills)
+        with tracer.stage('render'):
             print(vacancy_table)
 
 
+def check_parameters(filter_string, sort_string, reverse_sort):
+    if ':' not in filter_string and filter_string != "":
+        return "Формат ввода некорректен"
+    if filter_string.split(": ")[0] not in FILTER_KEYS and filter_string.split(": ")[0] != "":
+        return "Параметр поиска некорректен"
+    if filter_string.split(": ")[0] == "Оклад" and not filter_string.split(": ")[1].isdecimal():
+        return "Значение оклада должно быть целым числом"
+    if sort_string not in FILTER_KEYS and sort_string != "":
+        return "Параметр сортировки некорректен"
+    if reverse_sort not in ["Да", "Нет", ""]:
+        return "Порядок сортировки задан некорректно"
+    return None
+
+
+def check_numbers(numbers):
+    if not all(number.isdigit() and int(number) > 0 for number in numbers.split()[:2]):
+        return "Диапазон вывода задан некорректно"
+    return None
+
+
+def get_vacancy_rows(vacancy_query, filter_string, sort_string, reverse_sort, numbers, skills):
+    numbers = [int(number) - 1 for number in numbers.split()][:2]
+    fields = [tag for tag in TABLE_TAGS if len(skills) == 0 or tag in skills.split(', ')]
+    with tracer.stage('query'):
+        is_found, rows = vacancy_query.execute(filter_string, sort_string, convert_bool_reverse(reverse_sort),
+                                               *numbers)
+    with tracer.stage('format'):
+        return is_found, fields, [[number] + row for (number, _), row in
+                                  zip(rows, format_all([vacancy for _, vacancy in rows], fields))]
+
+
+def get_vacancy_table(vacancy_query, filter_string, sort_string, reverse_sort, numbers, skills):
+    if vacancy_query is None:
+        return "Нет данных"
+
+    is_found, fields, rows = get_vacancy_rows(vacancy_query, filter_string, sort_string, reverse_sort, numbers,
+                                              skills)
+    if not is_found:
+        return "Ничего не найдено"
+
+    vacancy_table = PrettyTable()
+    vacancy_table.hrules = 1
+    vacancy_table.align = "l"
+    vacancy_table.field_names = ["№"] + fields
+    vacancy_table._max_width = {field: 20 for field in vacancy_table.field_names}
+    for row in rows:
+        vacancy_table.add_row(row)
+    return vacancy_table
+
+
 def execute():
     data_vacancies = InputConect()
     data_vacancies.process_data()
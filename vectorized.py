@@ -0,0 +1,120 @@
+import numpy as np
+from aggregation import SalaryAccumulator, create_statistics
+from ingest import get_validators, parse_salary
+
+VECTORIZE_THRESHOLD = 100000
+
+
+def get_used_codes(codes, size):
+    return np.flatnonzero(np.bincount(codes, minlength=size)).tolist()
+
+
+def map_column(column, function, dtype, mask):
+    codes = np.asarray(column.codes)[mask]
+    vocabulary = column.get_vocabulary()
+    values = np.zeros(len(vocabulary), dtype=dtype)
+    for code in get_used_codes(codes, len(vocabulary)):
+        values[code] = function(vocabulary[code])
+    return values[codes]
+
+
+def group_by_first(codes):
+    unique, first = np.unique(codes, return_index=True)
+    order = np.argsort(first, kind='stable')
+    groups = np.empty(unique.max() + 1 if len(unique) else 0, dtype=np.int64)
+    groups[unique[order]] = np.arange(len(unique))
+    return unique[order], groups[codes]
+
+
+def get_accumulators(groups, size, salaries, rate_codes, rates, mask=None):
+    if mask is not None:
+        groups, salaries, rate_codes = groups[mask], salaries[mask], rate_codes[mask]
+    keys, inverse = np.unique(groups * len(rates) + rate_codes, return_inverse=True)
+    sums = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(sums, inverse, salaries)
+    accumulators = [SalaryAccumulator() for _ in range(size)]
+    for key, count, value in zip(keys.tolist(), np.bincount(inverse).tolist(), sums.tolist()):
+        accumulator = accumulators[key // len(rates)]
+        rate = rates[key % len(rates)]
+        accumulator.count += count
+        accumulator.sums[rate] = accumulator.sums.get(rate, 0) + value
+    return accumulators
+
+
+def get_rate_codes(currency, published_at, currency_rates, valid):
+    currency_indexes = map_column(currency, lambda value: currency_rates.currencies[value], np.int64, valid)
+    dates = published_at.get_vocabulary()
+    date_codes = np.asarray(published_at.codes)[valid]
+    date_indexes = np.zeros(len(dates), dtype=np.int64)
+    used_codes = get_used_codes(date_codes, len(dates))
+    date_indexes[used_codes] = currency_rates.get_date_indexes([dates[code] for code in used_codes])
+    return date_indexes[date_codes] * len(currency_rates.currencies) + currency_indexes
+
+
+def get_profession_rows(column, matcher, mask):
+    codes = np.asarray(column.codes)[mask]
+    vocabulary = column.get_vocabulary()
+    counts = np.zeros(len(vocabulary), dtype=np.int64)
+    professions = []
+    for code in get_used_codes(codes, len(vocabulary)):
+        found = matcher.find(vocabulary[code])
+        counts[code] = len(found)
+        professions.append(found)
+    offsets = np.zeros(len(vocabulary), dtype=np.int64)
+    offsets[counts > 0] = np.cumsum(counts[counts > 0]) - counts[counts > 0]
+    professions = np.array([index for found in professions for index in found], dtype=np.int64)
+
+    row_counts = counts[codes]
+    rows = np.repeat(np.arange(len(codes)), row_counts)
+    starts = np.repeat(offsets[codes] - (np.cumsum(row_counts) - row_counts), row_counts)
+    return rows, professions[starts + np.arange(len(rows))]
+
+
+def aggregate_table(table, profession_keys, profession_name, currency_rates):
+    name, salary_from, salary_to, currency, area_name, published_at = \
+        [table.get_column(key) for key in profession_keys]
+    is_batch = isinstance(profession_name, list)
+    statistics = create_statistics(profession_name, currency_rates)
+    valid = table.get_valid(profession_keys, statistics.rejected, get_validators(currency_rates.currencies))
+    statistics.count_vacancy = int(valid.sum())
+    if statistics.count_vacancy == 0:
+        return statistics
+
+    salaries = ((map_column(salary_from, parse_salary, np.float64, valid) +
+                 map_column(salary_to, parse_salary, np.float64, valid)) // 2).astype(np.int64)
+    years = map_column(published_at, lambda value: int(value[:4]), np.int64, valid)
+    areas = np.asarray(area_name.codes)[valid]
+    rate_codes = get_rate_codes(currency, published_at, currency_rates, valid)
+    rates = currency_rates.values
+
+    year_keys, year_groups = group_by_first(years)
+    year_keys = year_keys.tolist()
+    for key, accumulator in zip(year_keys, get_accumulators(year_groups, len(year_keys), salaries, rate_codes, rates)):
+        statistics.years[key] = accumulator
+    if profession_name is None:
+        name_codes = np.asarray(name.codes)[valid]
+        pair_keys, pair_groups = np.unique(name_codes * len(year_keys) + year_groups, return_inverse=True)
+        names = name.get_vocabulary()
+        for key, accumulator in zip(pair_keys.tolist(), get_accumulators(pair_groups, len(pair_keys), salaries,
+                                                                         rate_codes, rates)):
+            years = statistics.names.setdefault(names[key // len(year_keys)], dict())
+            years[year_keys[key % len(year_keys)]] = accumulator
+    elif is_batch:
+        rows, professions = get_profession_rows(name, statistics.matcher, valid)
+        accumulators = get_accumulators(professions * len(year_keys) + year_groups[rows],
+                                        len(profession_name) * len(year_keys), salaries[rows], rate_codes[rows], rates)
+        for index, years in enumerate(statistics.professions_years):
+            for offset, key in enumerate(year_keys):
+                years[key] = accumulators[index * len(year_keys) + offset]
+    else:
+        matches = map_column(name, lambda value: profession_name in value, np.bool_, valid)
+        for key, accumulator in zip(year_keys, get_accumulators(year_groups, len(year_keys), salaries, rate_codes,
+                                                                rates, matches)):
+            statistics.profession_years[key] = accumulator
+
+    area_codes, area_groups = group_by_first(areas)
+    areas = area_name.get_vocabulary()
+    for code, accumulator in zip(area_codes.tolist(), get_accumulators(area_groups, len(area_codes), salaries,
+                                                                       rate_codes, rates)):
+        statistics.cities[areas[code]] = accumulator
+    return statistics